@@ -18,6 +18,8 @@ import os
 import sys
 import time
 import math
+import json # used to load the (optional) light specification files
+import random # used to spread out the retries when linking to lots of lights at once
 import tempfile
 import argparse
 import asyncio
@@ -138,17 +140,142 @@ sendValue = [120, 135, 2, 50, 56, 50] # an array to hold the values to be sent t
 lastSelection = [] # the current light selection (this is for snapshot preset entering/leaving buttons)
 lastSortingField = -1 # the last field used for sorting purposes
 
-availableLights = [] # the list of Neewer lights currently available to control
-# List Subitems (for ^^^^^^):
-# [0] - UpdatedBLEInformation object (replaces Bleak object, but retains information) Object (can use .name / .realname / .address / .rssi / .HWMACaddr to get specifics)
-# [1] - Bleak Connection (the actual Bluetooth connection to the light itself)
-# [2] - Custom Name for Light (string)
-# [3] - Last Used Parameters (list)
-# [4] - The range of color temperatures to use in CCT mode (list, min, max) <- changed in 0.12
-# [5] - Whether or not to send Brightness and Hue independently for old lights (boolean)
-# [6] - Whether or not this light has been manually turned ON/OFF (boolean)
-# [7] - The Power and Channel data returned for this light (list)
-# [8] - Whether or not this light uses the new Infinity light protocol (int - 0: no, 1: yes, 2: protocol, but not Infinity light)
+# ONE LIGHT IN THE availableLights LIST - the fields can be used by name (light.customName) or by the
+# numbers listed below (availableLights[a][2]), so both ways of working with a light point at the same thing
+class Light:
+    __slots__ = ["handle", "registry", "info", "client", "_customName", "lastParams", "CCTRange", "CCTOnly", "isOn", "powerChannel", "infinityMode"]
+    fieldNames = ["info", "client", "customName", "lastParams", "CCTRange", "CCTOnly", "isOn", "powerChannel", "infinityMode"] # the names of fields [0] to [8]
+
+    def __init__(self, info, client, customName, lastParams, CCTRange, CCTOnly, isOn, powerChannel, infinityMode):
+        self.handle = None # the ID of this light, set by the list once the light is added to it (and never changed afterwards)
+        self.registry = None # the list this light has been added to
+        self.info = info
+        self.client = client
+        self._customName = customName
+        self.lastParams = lastParams
+        self.CCTRange = CCTRange
+        self.CCTOnly = CCTOnly
+        self.isOn = isOn
+        self.powerChannel = powerChannel
+        self.infinityMode = infinityMode
+
+    def __getitem__(self, field):
+        return getattr(self, Light.fieldNames[field])
+
+    def __setitem__(self, field, value):
+        setattr(self, Light.fieldNames[field], value)
+
+    def __len__(self):
+        return len(Light.fieldNames)
+
+    @property
+    def customName(self):
+        return self._customName
+
+    @customName.setter
+    def customName(self, customName):
+        self._customName = customName
+
+        if self.registry != None: # keep the custom name lookup up to date
+            self.registry.updateIndexes(self)
+
+# THE LIST OF LIGHTS, WHICH ALSO KEEPS TRACK OF WHERE EACH LIGHT IS BY ITS MAC ADDRESS/GUID, CUSTOM NAME AND HARDWARE
+# MAC ADDRESS (AND ITS HANDLE), SO FINDING A LIGHT DOESN'T NEED TO GO THROUGH THE WHOLE LIST
+class LightRegistry(list):
+    def __init__(self):
+        super().__init__()
+        self.nextHandle = 1 # the handle to give the next light added to the list
+        self.byHandle = {} # handle -> Light
+        self.byAddress = {} # MAC address/GUID (upper case) -> Light
+        self.byHWMACaddr = {} # hardware MAC address (upper case) -> Light
+        self.byCustomName = {} # custom name (casefolded, as the CLI and HTTP server change its case) -> list of Lights with that name
+        self.indexedKeys = {} # handle -> the [address, HW MAC address, custom name] the light was last indexed under
+        self.positions = {} # handle -> the light's current index in the list
+
+    def append(self, light):
+        if light.handle == None:
+            light.handle = self.nextHandle
+            self.nextHandle += 1
+
+        light.registry = self
+        self.positions[light.handle] = len(self)
+        self.byHandle[light.handle] = light
+        super().append(light)
+        self.updateIndexes(light)
+
+    def extend(self, lights):
+        for light in lights:
+            self.append(light)
+
+    def clear(self):
+        super().clear()
+        self.byHandle.clear()
+        self.byAddress.clear()
+        self.byHWMACaddr.clear()
+        self.byCustomName.clear()
+        self.indexedKeys.clear()
+        self.positions.clear()
+
+    def sort(self, key = None, reverse = False):
+        super().sort(key = key, reverse = reverse)
+        self.positions = {light.handle: a for a, light in enumerate(self)} # the lights themselves (and their handles) stay the same, only their order changes
+
+    # UPDATE THE LOOKUPS FOR ONE LIGHT (WHEN IT'S ADDED, OR ITS CUSTOM NAME OR HARDWARE MAC ADDRESS CHANGES)
+    def updateIndexes(self, light):
+        if light.handle not in self.byHandle:
+            return # this light isn't in the list (anymore)
+
+        if light.handle in self.indexedKeys: # remove the old entries for this light
+            oldAddress, oldHWMACaddr, oldCustomName = self.indexedKeys[light.handle]
+            self.byAddress.pop(oldAddress, None)
+            self.byHWMACaddr.pop(oldHWMACaddr, None)
+
+            if oldCustomName in self.byCustomName:
+                self.byCustomName[oldCustomName].remove(light)
+
+                if self.byCustomName[oldCustomName] == []:
+                    del self.byCustomName[oldCustomName]
+
+        newKeys = [light.info.address.upper(), None, light.customName.casefold()]
+
+        self.byAddress[newKeys[0]] = light
+
+        if light.info.HWMACaddr != None:
+            newKeys[1] = light.info.HWMACaddr.upper()
+            self.byHWMACaddr[newKeys[1]] = light
+
+        if light.customName != "":
+            self.byCustomName.setdefault(newKeys[2], []).append(light)
+        else:
+            newKeys[2] = None
+
+        self.indexedKeys[light.handle] = newKeys
+
+    def indexOf(self, light): # the current index of a light in the list
+        return self.positions[light.handle]
+
+    def findByAddress(self, address): # find a light by its MAC address/GUID, or by its hardware MAC address
+        light = self.byAddress.get(address.upper(), None)
+
+        if light == None:
+            light = self.byHWMACaddr.get(address.upper(), None)
+
+        return light
+
+    def findByCustomName(self, customName): # find all of the lights with a custom name (in any case)
+        return self.byCustomName.get(customName.casefold(), [])
+
+availableLights = LightRegistry() # the list of Neewer lights currently available to control
+# List Subitems are Light objects (for ^^^^^^), and can be used by number, or by the name in (brackets):
+# [0] (info) - UpdatedBLEInformation object (replaces Bleak object, but retains information) Object (can use .name / .realname / .address / .rssi / .HWMACaddr to get specifics)
+# [1] (client) - Bleak Connection (the actual Bluetooth connection to the light itself)
+# [2] (customName) - Custom Name for Light (string)
+# [3] (lastParams) - Last Used Parameters (list)
+# [4] (CCTRange) - The range of color temperatures to use in CCT mode (list, min, max) <- changed in 0.12
+# [5] (CCTOnly) - Whether or not to send Brightness and Hue independently for old lights (boolean)
+# [6] (isOn) - Whether or not this light has been manually turned ON/OFF (boolean)
+# [7] (powerChannel) - The Power and Channel data returned for this light (list)
+# [8] (infinityMode) - Whether or not this light uses the new Infinity light protocol (int - 0: no, 1: yes, 2: protocol, but not Infinity light)
 
 # Light Preset ***Default*** Settings (for sections below):
 # NOTE: The list is 0-based, so the preset itself is +1 from the subitem
@@ -177,29 +304,69 @@ customLightPresets = defaultLightPresets[:] # copy the default presets to the li
 
 threadAction = "" # the current action to take from the thread
 serverBusy = [False, ""] # whether or not the HTTP server is busy
+serverRequestsRunning = 0 # how many HTTP requests are being worked on right now
+serverRequestsLock = threading.Lock() # to keep the above count right when more than one request finishes at once
 asyncioEventLoop = None # the current asyncio loop
 
+lightSendQueues = {} # the send queue for each light, keyed by the light's handle (see LightSendQueue)
+sendQueueActivity = None # an asyncio Event set every time a new value is handed to the send queues
+scanLock = None # an asyncio Lock held while scanning for lights (see findDevices)
+linkLimit = None # an asyncio Semaphore every link to a light waits on, so only maxConnects lights are linked to at once (see connectSingleLight)
+passiveScanPause = None # an asyncio Event set when a scan for lights wants the background RSSI scan (see passiveScan) to step aside
+passiveScanStop = None # an asyncio Event set when the background RSSI scan should stop for good (see stopPassiveScan)
+scansWaiting = 0 # how many findDevices calls are waiting for (or running) a scan, so the background RSSI scan doesn't jump ahead of them
+workerCommands = None # the asyncio Queue of commands (see WorkerCommand) for the background worker to run, in order
+
 setLightUUID = "69400002-B5A3-F393-E0A9-E50E24DCCA99" # the UUID to send information to the light
 notifyLightUUID = "69400003-B5A3-F393-E0A9-E50E24DCCA99" # the UUID for notify callbacks from the light
 
-receivedData = "" # the data received from the Notify characteristic
+notifySubscriptions = {} # the Bleak connection each light's notifications are being read from, keyed by the light's handle
+notifyWaiters = {} # the futures waiting on each light's replies, keyed by handle, then by the kind of reply (the 2nd byte of the reply)
 
 # SET FROM THE PREFERENCES FILE ON LAUNCH
 findLightsOnStartup = True # whether or not to look for lights when the program starts
 autoConnectToLights = True # whether or not to auto-connect to lights after finding them
 printDebug = True # show debug messages in the console for all of the program's events
 maxNumOfAttempts = 6 # the maximum attempts the program will attempt an action before erroring out
+maxStatusChecks = 4 # the most lights to check the power/channel status of at the same time
 rememberLightsOnExit = False # whether or not to save the currently set light settings (mode/hue/brightness/etc.) when quitting out
 rememberPresetsOnExit = True # whether or not to save the custom preset list when quitting out
 acceptable_HTTP_IPs = [] # the acceptable IPs for the HTTP server, set on launch by prefs file
 customKeys = [] # custom keymappings for keyboard shortcuts, set on launch by the prefs file
 whiteListedMACs = [] # whitelisted list of MAC addresses to add to NeewerLite-Python
 enableTabsOnLaunch = False # whether or not to enable tabs on startup (even with no lights connected)
+simulatedLights = 0 # how many simulated lights of each kind to use instead of real ones (for testing without any lights or a Bluetooth adapter) - 0 uses real lights
+maxSendRate = 30 # the most values per second the send queue will write to any one light (slider drags are coalesced down to this)
+customSendRates = {} # per-light overrides for maxSendRate, keyed by MAC address/GUID, set on launch by the prefs file
+connectTimeout = 10 # the most seconds to wait for any one attempt at linking to a light
+connectDeadline = 60 # the most seconds to spend linking to any one light (across all attempts) before giving up on it
+autoReconnect = True # whether or not to re-link to lights in the background when their link drops (and re-send their last parameters)
+passiveScanning = False # whether or not to keep listening for lights in the background to keep their signal levels (RSSI) up to date
+discoveryCacheAge = 168 # how many hours to remember lights found on earlier scans for (so they can be linked to on launch without scanning first) - 0 turns this off
+targetedScanTime = 5 # the most seconds to look for the lights asked for with --light before giving up on the ones not found
+maxConnects = 3 # the most lights to try linking to at the same time (most Bluetooth adapters can only handle a few at once)
+reliableWrites = False # whether or not to have lights acknowledge each write (write-with-response), so writes that don't go through can be retried
+customReliableWrites = {} # per-light overrides for reliableWrites, keyed by MAC address/GUID, set on launch by the prefs file
+writeRetries = 2 # how many more times to try writing to a light when a write to it fails (only the lights that failed are written to again)
+refreshInterval = 5 # how many seconds to trust that a light still holds the last value written to it (sending the same value again sooner is skipped) - 0 always sends
+CCTSettleDelay = 50 # how many milliseconds CCT-only lights get to settle between the brightness and color temperature writes (unless their specs say otherwise)
+
+lastSeenTimes = {} # when each light was last found when scanning, keyed by MAC address/GUID (for the discovery cache)
+rssiSmoothing = 0.25 # how much each new signal level reading counts towards a light's (smoothed) RSSI - lower is smoother
+rssiDisplayTimes = {} # when each light's signal level was last updated in the table, keyed by handle (so the table isn't redrawn for every reading)
+lastLinkTimes = {} # when each light was last linked to successfully, keyed by MAC address/GUID (lights linked recently get linked first)
+linkingLights = set() # the handles of the lights being linked to right now
+reconnectTasks = {} # the background tasks re-linking to lights that dropped their link, keyed by handle
+unlinkRequested = set() # the handles of lights we've unlinked from on purpose (so they aren't re-linked to in the background)
+connectRetryDelays = [0.5, 8] # the starting and longest wait (in seconds) between link attempts - the wait doubles after each failed attempt
 
 lockFile = tempfile.gettempdir() + os.sep + "NeewerLite-Python.lock"
 anotherInstance = False # whether or not we're using a new instance (for the Singleton check)
 globalPrefsFile = os.path.dirname(os.path.abspath(sys.argv[0])) + os.sep + "light_prefs" + os.sep + "NeewerLite-Python.prefs" # the global preferences file for saving/loading
 customLightPresetsFile = os.path.dirname(os.path.abspath(sys.argv[0])) + os.sep + "light_prefs" + os.sep + "customLights.prefs"
+lightSpecsFiles = [os.path.dirname(os.path.abspath(sys.argv[0])) + os.sep + "NeewerLite-Python-lights.json", # extra light specs shipped alongside the program
+                   os.path.dirname(os.path.abspath(sys.argv[0])) + os.sep + "light_prefs" + os.sep + "lights.json"] # and the user's own additions/overrides
+discoveryCacheFile = os.path.dirname(os.path.abspath(sys.argv[0])) + os.sep + "light_prefs" + os.sep + "discoveryCache.prefs" # the lights found on earlier scans
 
 # FILE LOCKING FOR SINGLE INSTANCE
 def singleInstanceLock():
@@ -1297,17 +1464,8 @@ if PySideGUI != None: # create the GUI if the PySide GUI classes are imported
                 global lastSortingField
 
                 if theHeader < 2: # if we didn't click on the "Linked" or "Status" headers, start processing the sort
-                    sortingList = [] # a copy of the availableLights array
-                    checkForCustomNames = False # whether or not to ask to sort by custom names (if there aren't any custom names, then don't allow)
-
-                    for a in range(len(availableLights)): # copy the entire availableLights array into a temporary array to process it
-                        if theHeader == 0 and availableLights[a][2] != "": # if the current light has a custom name (and we clicked on Name)
-                            checkForCustomNames = True # then we need to ask what kind of sorting when we sort
-
-                        sortingList.append([availableLights[a][0], availableLights[a][1], availableLights[a][2], availableLights[a][3], \
-                                            availableLights[a][4], availableLights[a][5], availableLights[a][6], availableLights[a][7], \
-                                            availableLights[a][0].name, availableLights[a][0].address, availableLights[a][0].rssi, \
-                                            availableLights[a][8]])
+                    # whether or not to ask to sort by custom names (if there aren't any custom names, then don't allow)
+                    checkForCustomNames = theHeader == 0 and len(availableLights.byCustomName) > 0
                 else: # we clicked on the "Linked" or "Status" headers, which do not allow sorting
                     sortingField = -1
 
@@ -1366,15 +1524,36 @@ if PySideGUI != None: # create the GUI if the PySide GUI classes are imported
                             else:
                                 doReverseSort = True
 
-                    sortedList = sorted(sortingList, key = lambda x: x[sortingField], reverse = doReverseSort) # sort the list
-                    availableLights.clear() # clear the list of available lights
+                    if sortingField == 2: # sort by custom name
+                        sortingKey = lambda light: light.customName
+                    elif sortingField == 8: # sort by type of light
+                        sortingKey = lambda light: light.info.name
+                    elif sortingField == 9: # sort by MAC Address/GUID
+                        sortingKey = lambda light: light.info.address
+                    else: # sort by RSSI
+                        sortingKey = lambda light: light.info.rssi
+
+                    if self.lightTable.rowCount() != len(availableLights): # the table hasn't caught up with the list yet, so just sort and redraw it
+                        availableLights.sort(key = sortingKey, reverse = doReverseSort)
+                        self.updateLights(False)
+                    else:
+                        # KEEP WHAT EACH LIGHT'S ROW IS SHOWING (AND WHICH LIGHTS ARE SELECTED) BY HANDLE, SO IT CAN FOLLOW THE LIGHT TO ITS NEW ROW
+                        rowContents = {}
+
+                        for a in range(len(availableLights)):
+                            rowContents[availableLights[a].handle] = [self.returnTableInfo(a, b) for b in range(4)]
+
+                        selectedHandles = returnLightHandles(self.selectedLights())
+
+                        availableLights.sort(key = sortingKey, reverse = doReverseSort) # sort the list in place (the lights themselves stay the same)
 
-                    for a in range(len(sortedList)): # rebuild the available lights list from the sorted list
-                        availableLights.append([sortedList[a][0], sortedList[a][1], sortedList[a][2], sortedList[a][3], \
-                                                sortedList[a][4], sortedList[a][5], sortedList[a][6], sortedList[a][7], \
-                                                sortedList[a][11]])
-                                            
-                    self.updateLights(False) # redraw the table with the new light list
+                        for a in range(len(availableLights)): # move each row's contents to the light's new row, instead of redrawing the whole table
+                            for b in range(4):
+                                if self.returnTableInfo(a, b) != rowContents[availableLights[a].handle][b]:
+                                    self.lightTable.item(a, b).setText(rowContents[availableLights[a].handle][b])
+
+                        self.lightTable.resizeRowsToContents()
+                        self.selectRows(returnLightIndexesFromHandles(selectedHandles)) # and keep the same lights selected
                     lastSortingField = sortingField # keep track of the last field used for sorting, so we know whether or not to switch to ascending
                 else:
                     self.lightTable.horizontalHeader().setSortIndicatorShown(False) # hide the sorting indicator
@@ -1800,6 +1979,55 @@ if PySideGUI != None: # create the GUI if the PySide GUI classes are imported
                 # CARRY "HIDDEN" DEBUGGING OPTIONS TO PREFERENCES FILE
                 if enableTabsOnLaunch == True:
                     finalPrefs.append("enableTabsOnLaunch=1")
+
+                if simulatedLights != 0:
+                    finalPrefs.append("simulatedLights=" + str(simulatedLights))
+
+                # CARRY "HIDDEN" TUNING OPTIONS TO PREFERENCES FILE
+                if maxSendRate != 30:
+                    finalPrefs.append("maxSendRate=" + str(maxSendRate))
+
+                if customSendRates != {}:
+                    finalPrefs.append("customSendRates=" + ";".join([MAC + "=" + str(rate) for MAC, rate in customSendRates.items()]))
+
+                if maxStatusChecks != 4:
+                    finalPrefs.append("maxStatusChecks=" + str(maxStatusChecks))
+
+                if connectTimeout != 10:
+                    finalPrefs.append("connectTimeout=" + str(connectTimeout))
+
+                if connectDeadline != 60:
+                    finalPrefs.append("connectDeadline=" + str(connectDeadline))
+
+                if maxConnects != 3:
+                    finalPrefs.append("maxConnects=" + str(maxConnects))
+
+                if targetedScanTime != 5:
+                    finalPrefs.append("targetedScanTime=" + str(targetedScanTime))
+
+                if discoveryCacheAge != 168:
+                    finalPrefs.append("discoveryCacheAge=" + str(discoveryCacheAge))
+
+                if passiveScanning == True:
+                    finalPrefs.append("passiveScanning=1")
+
+                if autoReconnect == False:
+                    finalPrefs.append("autoReconnect=0")
+
+                if reliableWrites == True:
+                    finalPrefs.append("reliableWrites=1")
+
+                if customReliableWrites != {}:
+                    finalPrefs.append("customReliableWrites=" + ";".join([MAC + "=" + str(int(reliable)) for MAC, reliable in customReliableWrites.items()]))
+
+                if writeRetries != 2:
+                    finalPrefs.append("writeRetries=" + str(writeRetries))
+
+                if refreshInterval != 5:
+                    finalPrefs.append("refreshInterval=" + str(refreshInterval))
+
+                if CCTSettleDelay != 50:
+                    finalPrefs.append("CCTSettleDelay=" + str(CCTSettleDelay))
                 
                 if len(finalPrefs) > 0: # if we actually have preferences to save...
                     with open(globalPrefsFile, mode="w", encoding="utf-8") as prefsFileToWrite:
@@ -2015,22 +2243,25 @@ if PySideGUI != None: # create the GUI if the PySide GUI classes are imported
                 
             # TELL THE BACKGROUND THREAD TO START LOOKING FOR LIGHTS
             def startSelfSearch(self):
-                global threadAction
-                threadAction = "discover"
+                submitWorkerCommand(DiscoverCommand())
 
                 self.statusBar.showMessage("Please wait - searching for Neewer lights...")
 
             # TELL THE BACKGROUND THREAD TO START CONNECTING TO LIGHTS
             def startConnect(self):
-                global threadAction
-                threadAction = "connect"
+                submitWorkerCommand(ConnectCommand())
 
             # TELL THE BACKGROUND THREAD TO START SENDING TO THE LIGHTS
             def startSend(self):
                 global threadAction
 
-                if threadAction == "":
+                # HAND THE NEW VALUE STRAIGHT TO THE SEND QUEUES OF THE SELECTED LIGHTS, INSTEAD OF WAITING FOR
+                # THE SEND LOOP TO NOTICE sendValue CHANGED (this runs as soon as the asyncio loop gets to it)
+                asyncioEventLoop.call_soon_threadsafe(queueSendToLights, self.selectedLights(), sendValue[:])
+
+                if threadAction == "": # if we're not already in send mode, then tell the worker to go into it
                     threadAction = "send"
+                    submitWorkerCommand(SendCommand())
 
             # CLEAR THE SCENE TABS OF ALL SLIDERS
             def cleanSlate(self):
@@ -2371,44 +2602,49 @@ if PySideGUI != None: # create the GUI if the PySide GUI classes are imported
                 self.clearTheTable()
 
                 if updateTaskbar == True: # if we're scanning for lights, then update the taskbar - if we're just sorting, then don't
-                    if len(availableLights) != 0: # if we found lights on the last scan
-                        if self.scanCommandButton.text() == "Scan":
-                            self.scanCommandButton.setText("Re-scan") # change the "Scan" button to "Re-scan"
-
-                        if len(availableLights) == 1: # we found 1 light
-                            self.statusBar.showMessage("We located 1 Neewer light on the last search")
-                        elif len(availableLights) > 1: # we found more than 1 light
-                            self.statusBar.showMessage(f"We located {len(availableLights)} Neewer lights on the last search")
-                    else: # if we didn't find any (additional) lights on the last scan
-                        self.statusBar.showMessage("We didn't locate any Neewer lights on the last search")
+                    self.updateScanStatus()
 
                 for a in range(len(availableLights)):
-                    if availableLights[a][1] == "": # the light does not currently have a Bleak object connected to it
-                        if availableLights[a][2] != "": # the light has a custom name, so add the custom name to the light
-                            self.setTheTable([availableLights[a][2] + " (" + availableLights[a][0].name + ")" + "\n  [ʀssɪ: " + str(availableLights[a][0].rssi) + " dBm]", availableLights[a][0].address, "Waiting", "Waiting to connect..."])
-                        else: # the light does not have a custom name, so just use the model # of the light
-                            self.setTheTable([availableLights[a][0].name + "\n  [ʀssɪ: " + str(availableLights[a][0].rssi) + " dBm]", availableLights[a][0].address, "Waiting", "Waiting to connect..."])
-                    else: # the light does have a Bleak object connected to it
-                        if availableLights[a][2] != "": # the light has a custom name, so add the custom name to the light
-                            if availableLights[a][1].is_connected: # we have a connection to the light
-                                self.setTheTable([availableLights[a][2] + " (" + availableLights[a][0].name + ")" + "\n  [ʀssɪ: " + str(availableLights[a][0].rssi) + " dBm]", availableLights[a][0].address, "LINKED", "Waiting to send..."])
-                            else: # we're still trying to connect, or haven't started trying yet
-                                self.setTheTable([availableLights[a][2] + " (" + availableLights[a][0].name + ")" + "\n  [ʀssɪ: " + str(availableLights[a][0].rssi) + " dBm]", availableLights[a][0].address, "Waiting", "Waiting to connect..."])
-                        else: # the light does not have a custom name, so just use the model # of the light
-                            if availableLights[a][1].is_connected:
-                                self.setTheTable([availableLights[a][0].name + "\n  [ʀssɪ: " + str(availableLights[a][0].rssi) + " dBm]", availableLights[a][0].address, "LINKED", "Waiting to send..."])
-                            else:
-                                self.setTheTable([availableLights[a][0].name + "\n  [ʀssɪ: " + str(availableLights[a][0].rssi) + " dBm]", availableLights[a][0].address, "Waiting", "Waiting to connect..."])
+                    self.addLightToTable(a)
+
+            # SHOW HOW MANY LIGHTS WERE FOUND ON THE LAST SCAN IN THE TASKBAR
+            def updateScanStatus(self):
+                if len(availableLights) != 0: # if we found lights on the last scan
+                    if self.scanCommandButton.text() == "Scan":
+                        self.scanCommandButton.setText("Re-scan") # change the "Scan" button to "Re-scan"
+
+                    if len(availableLights) == 1: # we found 1 light
+                        self.statusBar.showMessage("We located 1 Neewer light on the last search")
+                    elif len(availableLights) > 1: # we found more than 1 light
+                        self.statusBar.showMessage(f"We located {len(availableLights)} Neewer lights on the last search")
+                else: # if we didn't find any (additional) lights on the last scan
+                    self.statusBar.showMessage("We didn't locate any Neewer lights on the last search")
+
+            # ADD A ROW TO THE END OF THE TABLE FOR THE LIGHT AT availableLights[a] (AS SOON AS IT'S FOUND WHEN SCANNING, OR WHEN REDRAWING THE TABLE)
+            def addLightToTable(self, a):
+                if availableLights[a][1] != "" and availableLights[a][1].is_connected: # we have a connection to the light
+                    self.setTheTable([self.returnLightTableName(a), availableLights[a][0].address, "LINKED", "Waiting to send..."])
+                else: # the light does not have a Bleak object connected to it, or we're still trying to connect, or haven't started trying yet
+                    self.setTheTable([self.returnLightTableName(a), availableLights[a][0].address, "Waiting", "Waiting to connect..."])
+
+            # THE NAME OF THE LIGHT AT availableLights[a] (AND ITS SIGNAL LEVEL) AS SHOWN IN THE TABLE
+            def returnLightTableName(self, a):
+                if availableLights[a][2] != "": # the light has a custom name, so add the custom name to the light
+                    return availableLights[a][2] + " (" + availableLights[a][0].name + ")" + "\n  [ʀssɪ: " + str(availableLights[a][0].rssi) + " dBm]"
+                else: # the light does not have a custom name, so just use the model # of the light
+                    return availableLights[a][0].name + "\n  [ʀssɪ: " + str(availableLights[a][0].rssi) + " dBm]"
 
             # THE FINAL FUNCTION TO UNLINK ALL LIGHTS WHEN QUITTING THE PROGRAM
             def closeEvent(self, event):
                 global threadAction
 
                 # WAIT UNTIL THE BACKGROUND THREAD SETS THE threadAction FLAG TO finished SO WE CAN UNLINK THE LIGHTS
+                printDebugString("Waiting for the background thread to terminate...")
+                threadAction = "quit" # stop anything the thread is working on now
+                submitWorkerCommand(QuitCommand()) # and tell it to stop once it's done
+
                 while threadAction != "finished": # wait until the background thread has a chance to terminate
-                    printDebugString("Waiting for the background thread to terminate...")
-                    threadAction = "quit" # make sure to tell the thread to quit again (if it missed it the first time)
-                    time.sleep(2)
+                    time.sleep(0.1)
 
                 if rememberPresetsOnExit == True:
                     printDebugString("You asked NeewerLite-Python to save the custom parameters on exit, so we will do that now...")
@@ -2458,7 +2694,7 @@ if PySideGUI != None: # create the GUI if the PySide GUI classes are imported
                 self.statusBar.showMessage("Quitting program - unlinking from lights...")
                 QApplication.processEvents() # force the status bar to update
 
-                asyncioEventLoop.run_until_complete(parallelAction("disconnect", [-1])) # disconnect from all lights in parallel
+                runOnLoopAndWait(parallelAction("disconnect", [-1])) # disconnect from all lights in parallel
 
                 printDebugString("Closing the program NOW")
 
@@ -2682,17 +2918,27 @@ if PySideGUI != None: # create the GUI if the PySide GUI classes are imported
     except NameError:
         pass # could not load the GUI, but we have already logged an error message
 
+# SET UP ONE ASYNCIO LOOP FOR THE WHOLE PROGRAM, RUNNING FOREVER IN ITS OWN THREAD - EVERYTHING ELSE (THE GUI, THE
+# HTTP SERVER, THE CLI) HANDS IT WORK WITH runOnLoop / runOnLoopAndWait, SO THEIR WORK CAN OVERLAP INSTEAD OF TAKING TURNS
 def setUpAsyncio():
     global asyncioEventLoop
 
-    try:
-        asyncioEventLoop = asyncio.get_running_loop()
-    except RuntimeError:
-        asyncioEventLoop = asyncio.new_event_loop()
-    except AttributeError:
-        asyncioEventLoop = asyncio.new_event_loop()
+    asyncioEventLoop = asyncio.new_event_loop()
+
+    asyncioThread = threading.Thread(target=runAsyncioLoop, args=(asyncioEventLoop,), name="asyncioThread", daemon=True)
+    asyncioThread.start()
+
+def runAsyncioLoop(_loop):
+    asyncio.set_event_loop(_loop)
+    _loop.run_forever()
 
-    asyncio.set_event_loop(asyncioEventLoop)
+# RUN A COROUTINE ON THE ASYNCIO LOOP FROM ANY THREAD - returns a future to get the result from later
+def runOnLoop(coroutine):
+    return asyncio.run_coroutine_threadsafe(coroutine, asyncioEventLoop)
+
+# SAME AS ABOVE, BUT WAIT FOR THE COROUTINE TO FINISH AND RETURN ITS RESULT
+def runOnLoopAndWait(coroutine):
+    return runOnLoop(coroutine).result()
 
 def saveLightPrefs(lightID, deleteFile = False): # save a sidecar file with the preferences for a specific light
     createLightPrefsFolder() # create the light_prefs folder if it doesn't exist
@@ -2786,7 +3032,7 @@ def customPresetInfoBuilder(numOfPreset, formatForHTTP = False):
     else:
         return "<BR>".join(toolTipBuilder)
 
-def recallCustomPreset(numOfPreset, updateGUI=True, loop=None):
+def recallCustomPreset(numOfPreset, updateGUI=True):
     global availableLights
     global lastSelection
 
@@ -2823,10 +3069,9 @@ def recallCustomPreset(numOfPreset, updateGUI=True, loop=None):
             mainWindow.lightTable.setFocus() # set the focus to the light table, in order to show which rows are selected
             mainWindow.selectRows(changedLights) # select those rows affected by the lights above
 
-            global threadAction
-            threadAction = "send|" + "|".join(map(str, changedLights)) # set the thread to write to all of the affected lights
+            submitWorkerCommand(SendStoredCommand(returnLightHandles(changedLights))) # tell the worker to write to all of the affected lights (by their handles)
         else:
-            processMultipleSends(loop, "send|" + "|".join(map(str, changedLights)), updateGUI)
+            reportWriteResults(runOnLoopAndWait(bulkWrite(changedLights, None, False, writeRetries))) # write to all of the affected lights, and show which ones didn't work
 
 def saveCustomPreset(presetType, numOfPreset, selectedLights = []):
     global customLightPresets
@@ -2998,111 +3243,87 @@ def splitMACAddress(MACAddress, returnInt = False):
 
         return MACReturn
 
-# CALCULATE THE BYTESTRING TO SEND TO THE LIGHT
-def calculateByteString(returnValue = False, **modeArgs):
-    if modeArgs["colorMode"] == "CCT":
-        # We're in CCT (color balance) mode
-        computedValue = [120, 135, 2]
-
-        computedValue.append(int(modeArgs["brightness"])) # the brightness value
-        computedValue.append(int(modeArgs["temp"])) # the color temp value, ranging from 32(00K) to 85(00)K - some lights (like the SL-80) can go as high as 8500K
-        computedValue.append(int(modeArgs["GM"])) # the GM compensation value, from -50 to 50
-    elif modeArgs["colorMode"] == "HSI":
-        # We're in HSI (any color of the spectrum) mode
-        computedValue = [120, 134, 4]
-
-        computedValue.append(int(modeArgs["hue"]) & 255) # hue value, up to 255
-        computedValue.append((int(modeArgs["hue"]) & 65280) >> 8) # offset value, computed from above value
-        computedValue.append(int(modeArgs["saturation"])) # saturation value
-        computedValue.append(int(modeArgs["brightness"])) # intensity value
-    elif modeArgs["colorMode"] == "ANM":
-        # We're in ANM (animation) mode
-        computedValue = [120, 136, 2]
-
-        if "effect" in modeArgs:
-            effect = int(modeArgs["effect"])
-        if "brightness" in modeArgs:
-            brightness = int(modeArgs["brightness"])
-        if "bright_min" in modeArgs:
-            bright_min = int(modeArgs["bright_min"])
-        if "bright_max" in modeArgs:
-            bright_max = int(modeArgs["bright_max"])
-        if "temp" in modeArgs:
-            temp = int(modeArgs["temp"])
-        if "temp_min" in modeArgs:
-            temp_min = int(modeArgs["temp_min"])
-        if "temp_max" in modeArgs:
-            temp_max = int(modeArgs["temp_max"])
-        if "GM" in modeArgs:
-            GM = int(modeArgs["GM"])
-        if "hue" in modeArgs:
-            hue = int(modeArgs["hue"])
-            hue = [hue & 255, (hue & 65280) >> 8]
-        if "hue_min" in modeArgs:
-            hue_min = int(modeArgs["hue_min"])
-            hue_min = [hue_min & 255, (hue_min & 65280) >> 8]
-        if "hue_max" in modeArgs:
-            hue_max = int(modeArgs["hue_max"])
-            hue_max = [hue_max & 255, (hue_max & 65280) >> 8]
-        if "saturation" in modeArgs:
-            saturation = int(modeArgs["saturation"])
-        if "speed" in modeArgs:
-            speed = int(modeArgs["speed"])
-        if "sparks" in modeArgs:
-            sparks = int(modeArgs["sparks"])
-        if "specialOptions" in modeArgs:
-            specialOptions = int(modeArgs["specialOptions"])
-
-        if effect == 1: # Lightning
-            computedValue.extend([effect, brightness, temp, speed])
-        elif effect == 2 or effect == 3 or effect == 6 or effect == 8: # Paparazzi, Defective Bulb, CCT Flash or CCT Pulse
-            computedValue.extend([effect, brightness, temp, GM, speed])
-        elif effect == 4: # Explosion
-            computedValue.extend([effect, brightness, temp, GM, speed, sparks])
-        elif effect == 5: # Welding
-            computedValue.extend([effect, bright_min, bright_max, temp, GM, speed])
-        elif effect == 7 or effect == 9: # Hue Flash or Hue Pulse
-            computedValue.extend([effect, brightness, hue[0], hue[1], saturation, speed])
-        elif effect == 10: # Cop Car
-            computedValue.extend([effect, brightness, specialOptions, speed])
-        elif effect == 11: # Candlelight
-            computedValue.extend([effect, bright_min, bright_max, temp, GM, speed, sparks])
-        elif effect == 12: # Hue Loop
-            computedValue.extend([effect, brightness, hue_min[0], hue_min[1], hue_max[0], hue_max[1], speed])
-        elif effect == 13: # CCT Loop
-            computedValue.extend([effect, brightness, temp_min, temp_max, speed])
-        elif effect == 14: # INT Loop (CCT)
-            computedValue.extend([14, 0, bright_min, bright_max, 0, 0, temp, speed])
-        elif effect == 15: # INT Loop (HSI)
-            computedValue.extend([14, 1, bright_min, bright_max, hue[0], hue[1], 0, speed])
-        elif effect == 16: # TV Screen (effect is #15)
-            computedValue.extend([15, bright_min, bright_max, temp, GM, speed])
-        elif effect == 17: # Fireworks (effect is #16)
-            computedValue.extend([16, brightness, specialOptions, speed, sparks])
-        elif effect == 18: # Party (effect is #17)
-            computedValue.extend([17, brightness, specialOptions, speed])
+# THE LAYOUT OF EVERY MODE (AND EVERY FX IN ANM MODE) IN THE GENERIC BYTESTRING [120, mode, 2/4, ...]
+# This one table is used both to build bytestrings (calculateByteString) and to read them back (translateByteString)
+# Each layout lists the bytes after the 120 header in order - numbers are sent as-is, names are taken from the parameters
+# (hue, hue_min and hue_max take up 2 bytes each, the low byte first)
+byteStringLayouts = {
+    "CCT": [135, 2, "brightness", "temp", "GM"],
+    "HSI": [134, 4, "hue", "saturation", "brightness"],
+    "ON": [129, 1, 1],
+    "OFF": [129, 1, 2],
+    "ANM": {
+        1: [136, 2, 1, "brightness", "temp", "speed"], # Lightning
+        2: [136, 2, 2, "brightness", "temp", "GM", "speed"], # Paparazzi
+        3: [136, 2, 3, "brightness", "temp", "GM", "speed"], # Defective Bulb
+        4: [136, 2, 4, "brightness", "temp", "GM", "speed", "sparks"], # Explosion
+        5: [136, 2, 5, "bright_min", "bright_max", "temp", "GM", "speed"], # Welding
+        6: [136, 2, 6, "brightness", "temp", "GM", "speed"], # CCT Flash
+        7: [136, 2, 7, "brightness", "hue", "saturation", "speed"], # Hue Flash
+        8: [136, 2, 8, "brightness", "temp", "GM", "speed"], # CCT Pulse
+        9: [136, 2, 9, "brightness", "hue", "saturation", "speed"], # Hue Pulse
+        10: [136, 2, 10, "brightness", "specialOptions", "speed"], # Cop Car
+        11: [136, 2, 11, "bright_min", "bright_max", "temp", "GM", "speed", "sparks"], # Candlelight
+        12: [136, 2, 12, "brightness", "hue_min", "hue_max", "speed"], # Hue Loop
+        13: [136, 2, 13, "brightness", "temp_min", "temp_max", "speed"], # CCT Loop
+        14: [136, 2, 14, 0, "bright_min", "bright_max", 0, 0, "temp", "speed"], # INT Loop (CCT)
+        15: [136, 2, 14, 1, "bright_min", "bright_max", "hue", 0, "speed"], # INT Loop (HSI) (effect is #14)
+        16: [136, 2, 15, "bright_min", "bright_max", "temp", "GM", "speed"], # TV Screen (effect is #15)
+        17: [136, 2, 16, "brightness", "specialOptions", "speed", "sparks"], # Fireworks (effect is #16)
+        18: [136, 2, 17, "brightness", "specialOptions", "speed"], # Party (effect is #17)
 
         # OLD EFFECT PARAMETERS RETROFITTED WITH INFINITY COMMANDS
-        elif effect == 21: # OLD EFFECT: Cop Car
-            computedValue.extend([effect, brightness, 2, 5])
-        elif effect == 22: # OLD EFFECT: Ambulance
-            computedValue.extend([effect, brightness, 75, 50, 5])
-        elif effect == 23: # OLD EFFECT: Fire Engine
-            computedValue.extend([effect, brightness, 0, 0, 55, 0, 10]) # this doesn't *exactly* match the old FX, but it's close
-        elif effect == 24: # OLD EFFECT: Fireworks
-            computedValue.extend([effect, brightness, 49, 0, 20, 1, 8]) # HUE LOOP actually matches more closely to the old FX
-        elif effect == 25: # OLD EFFECT: Party
-            computedValue.extend([effect, brightness, 1, 10])
-        elif effect == 26: # OLD EFFECT: Candlelight
-            computedValue.extend([effect, 2, brightness, 32, 50, 10, 4])
-        elif effect == 27: # OLD EFFECT: Lightning
-            computedValue.extend([effect, brightness, 75, 10])
-        elif effect == 28: # OLD EFFECT: Paparazzi
-            computedValue.extend([effect, brightness, 75, 50, 10])
-        elif effect == 29: # OLD EFFECT: TV Screen
-            computedValue.extend([effect, 2, brightness, 75, 50, 10])
+        21: [136, 2, 21, "brightness", 2, 5], # OLD EFFECT: Cop Car
+        22: [136, 2, 22, "brightness", 75, 50, 5], # OLD EFFECT: Ambulance
+        23: [136, 2, 23, "brightness", 0, 0, 55, 0, 10], # OLD EFFECT: Fire Engine - this doesn't *exactly* match the old FX, but it's close
+        24: [136, 2, 24, "brightness", 49, 0, 20, 1, 8], # OLD EFFECT: Fireworks - HUE LOOP actually matches more closely to the old FX
+        25: [136, 2, 25, "brightness", 1, 10], # OLD EFFECT: Party
+        26: [136, 2, 26, 2, "brightness", 32, 50, 10, 4], # OLD EFFECT: Candlelight
+        27: [136, 2, 27, "brightness", 75, 10], # OLD EFFECT: Lightning
+        28: [136, 2, 28, "brightness", 75, 50, 10], # OLD EFFECT: Paparazzi
+        29: [136, 2, 29, 2, "brightness", 75, 50, 10] # OLD EFFECT: TV Screen
+    }
+}
+
+# THE VALUES TO USE IF A PARAMETER A LAYOUT NEEDS WASN'T GIVEN (FROM AN OLD PRESET, THE HTTP SERVER, ETC.)
+byteStringDefaults = {"brightness": 100, "temp": 56, "GM": 50, "hue": 240, "saturation": 100, "speed": 5, "sparks": 0, "specialOptions": 1,
+                      "bright_min": 0, "bright_max": 100, "temp_min": 32, "temp_max": 56, "hue_min": 0, "hue_max": 360}
+
+twoByteParameters = ["hue", "hue_min", "hue_max"] # the parameters that are split into 2 bytes in the bytestring
+
+# THE LAYOUTS ABOVE, INDEXED BY [mode byte, effect byte] TO READ A BYTESTRING BACK INTO ITS PARAMETERS
+# (FX 14 has 2 layouts - CCT and HSI - which are told apart by the byte after the effect)
+byteStringDecoders = {}
+
+for layoutMode in byteStringLayouts:
+    if layoutMode == "ANM":
+        for FXLayout in byteStringLayouts["ANM"].values():
+            byteStringDecoders.setdefault((136, FXLayout[2]), []).append(("ANM", FXLayout))
     else:
+        byteStringDecoders.setdefault((byteStringLayouts[layoutMode][0], None), []).append((layoutMode, byteStringLayouts[layoutMode]))
+
+# CALCULATE THE BYTESTRING TO SEND TO THE LIGHT
+def calculateByteString(returnValue = False, **modeArgs):
+    if modeArgs["colorMode"] == "ANM":
+        layout = byteStringLayouts["ANM"].get(int(modeArgs["effect"]), [136, 2]) # an unknown FX only gets the ANM header
+    else:
+        layout = byteStringLayouts.get(modeArgs["colorMode"], None)
+
+    if layout == None:
         computedValue = [0]
+    else:
+        computedValue = [120]
+
+        for byte in layout:
+            if type(byte) is int: # this byte is always the same
+                computedValue.append(byte)
+            else: # this byte comes from one of the parameters
+                value = int(modeArgs.get(byte, byteStringDefaults[byte]))
+
+                if byte in twoByteParameters:
+                    computedValue.extend([value & 255, (value & 65280) >> 8]) # the value, up to 255, and the offset value, computed from the value
+                else:
+                    computedValue.append(value)
 
     if returnValue == False: # if we aren't supposed to return a value, then just set sendValue to the value returned from computedValue
         global sendValue
@@ -3110,21 +3331,6 @@ def calculateByteString(returnValue = False, **modeArgs):
     else:
         return computedValue # return the computed value
 
-# RECALCULATE THE BYTESTRING FOR CCT-ONLY NEEWER LIGHTS INTO HUE AND BRIGHTNESS SEPARATELY
-def calculateSeparateBytestrings(sendValue):
-    # CALCULATE BRIGHTNESS ONLY PARAMETER FROM MAIN PARAMETER
-    newValueBRI = [120, 130, 1, sendValue[3]]
-    
-    # CALCULATE HUE ONLY PARAMETER FROM MAIN PARAMETER
-    newValueHUE = [120, 131, 1, sendValue[4]]
-    
-    if CCTSlider == -1: # return both newly computed values
-        return [newValueBRI, newValueHUE]
-    elif CCTSlider == 1: # return only the color temperature value
-        return newValueHUE
-    elif CCTSlider == 2: # return only the brightness value
-        return newValueBRI
-
 # CALCULATE THE CHECKSUM FROM A BYTESTRING AND ADD IT TO THE END OF THE LIST
 def tagChecksum(sendValue):
     returnArray = []
@@ -3142,6 +3348,99 @@ def tagChecksum(sendValue):
     returnArray.append(checkSum)
     return returnArray
 
+# HOW EACH KIND OF LIGHT NEEDS EACH MODE OF THE GENERIC BYTESTRING SENT TO IT, KEYED BY [protocol, mode byte]
+# The protocols are the Infinity modes (0 - older lights, 1 - Infinity lights, 2 - Infinity-protocol hybrids),
+# and -1 for CCT-only lights (which set brightness and color temperature with separate commands)
+# Each entry is a list of commands to write in order (a number between them is a delay in seconds) - in each command:
+#   a number is sent as-is, ["value", x] is byte x of the generic bytestring, ["rest", x] is every byte from x on,
+#   ["length", x] is the length of the generic bytestring + x, ["FX", x] is the effect byte converted with convertFXIndex(x, ...)
+#   and "MAC" is the 6 bytes of the light's hardware MAC address (from UpdatedBLEInformation.HWMACbytes)
+# Combinations that aren't listed are sent as-is, and combinations set to None can't be used by that kind of light
+wireLayouts = {
+    (0, 135): [[120, 135, 2, ["value", 3], ["value", 4]]],
+    (0, 136): [[120, 136, 2, ["value", 4], ["FX", False]]], # older lights have the effect and brightness the other way around
+    # THE LAST 2 VALUES FOR CCT MODE ARE:
+    # G/M COMPENSATION (WIP)
+    # ...........4.  NOT REALLY SURE **WHY** IT'S 4, BUT... IT'S 4.
+    (1, 135): [[120, 144, 11, "MAC", 135, ["value", 3], ["value", 4], ["value", 5], 4]],
+    (1, 134): [[120, 143, 11, "MAC", 134, ["rest", 3]]],
+    (1, 136): [[120, 145, ["length", 4], "MAC", 139, ["FX", True], ["rest", 4]]],
+    (1, 129): [[120, 141, 8, "MAC", 129, ["value", 3]]],
+    (2, 135): [[120, 135, 3, ["rest", 3]]], # this light requires 3 parameters
+    (2, 136): [[120, 139, ["length", -3], ["rest", 3]]], # Infinity-style FX mode, with (total - 3) parameters
+    (-1, 134): None, # CCT-only lights can't use HSI mode
+    (-1, 136): None # or ANM/SCENE mode
+}
+
+# THE COMMANDS TO SEND BEFORE A MODE (LAID OUT THE SAME WAY AS wireLayouts), UNLESS THE LIGHT IS ALREADY IN THAT MODE
+powerCycleLayouts = {
+    (1, 136): [[120, 141, 8, "MAC", 129, 0], 0.05, [120, 141, 8, "MAC", 129, 1], 0.05] # cycle power to the light before sending the animation parameters
+}
+
+lastWriteResults = {} # the WriteResult of the last bulkWrite to each light, keyed by handle
+lastWrittenValues = {} # the last value written to each light without an error, and when, keyed by handle (so writing the same value again can be skipped)
+sceneRunningLights = set() # the handles of Infinity lights already running a scene (so the next scene can be sent without cycling power first)
+
+# CCT MODE ON CCT-ONLY LIGHTS, KEYED BY WHICH SLIDER CHANGED (CCTSlider) - -1 is both, 1 is color temperature and 2 is brightness
+separateCCTLayouts = {
+    -1: [[120, 130, 1, ["value", 3]], 0.05, [120, 131, 1, ["value", 4]]], # wait between the 2 to give the light time to settle (the light's own settle delay is used instead when sending)
+    1: [[120, 131, 1, ["value", 4]]],
+    2: [[120, 130, 1, ["value", 3]]]
+}
+
+wireByteStringCache = {} # the commands already calculated by encodeForLight, so sending the same value again is just a lookup
+
+# CONVERT A GENERIC BYTESTRING INTO THE COMMANDS (READY TO WRITE, WITH CHECKSUMS) FOR ONE KIND OF LIGHT
+# Returns a list of bytes objects (and delays between them), or None if this kind of light can't use that mode
+# (if powerCycle is False, the commands in powerCycleLayouts for that mode are left off)
+def encodeForLight(protocol, sendValue, HWMACbytes = None, powerCycle = True):
+    cacheKey = (protocol, CCTSlider if protocol == -1 else 0, tuple(sendValue), HWMACbytes, powerCycle)
+
+    if cacheKey in wireByteStringCache:
+        return wireByteStringCache[cacheKey]
+
+    if protocol == -1 and sendValue[1] == 135:
+        layout = separateCCTLayouts[CCTSlider]
+    else:
+        layout = wireLayouts.get((protocol, sendValue[1]), [[["rest", 0]]])
+
+        if powerCycle == True and layout != None and (protocol, sendValue[1]) in powerCycleLayouts:
+            layout = powerCycleLayouts[(protocol, sendValue[1])] + layout
+
+    if layout == None:
+        encodedCommands = None
+    else:
+        encodedCommands = []
+
+        for command in layout:
+            if type(command) is float: # this is a delay between commands
+                encodedCommands.append(command)
+                continue
+
+            encodedCommand = []
+
+            for byte in command:
+                if type(byte) is int:
+                    encodedCommand.append(byte)
+                elif byte == "MAC":
+                    encodedCommand.extend(HWMACbytes)
+                elif byte[0] == "value":
+                    encodedCommand.append(sendValue[byte[1]])
+                elif byte[0] == "rest":
+                    encodedCommand.extend(sendValue[byte[1]:])
+                elif byte[0] == "length":
+                    encodedCommand.append(len(sendValue) + byte[1])
+                elif byte[0] == "FX":
+                    encodedCommand.append(convertFXIndex(byte[1], sendValue[3]))
+
+            encodedCommands.append(bytes(tagChecksum(encodedCommand)))
+
+    if len(wireByteStringCache) > 1000: # don't let the cache grow forever (if a slider has been dragged around a lot)
+        wireByteStringCache.clear()
+
+    wireByteStringCache[cacheKey] = encodedCommands
+    return encodedCommands
+
 def setPowerBytestring(onOrOff):
     global sendValue
 
@@ -3150,121 +3449,59 @@ def setPowerBytestring(onOrOff):
     else:
         sendValue = [120, 129, 1, 2] # return the "turn off" bytestring
 
-def getInfinityPowerBytestring(onOrOff, lightMACAddress):
-    powerByteString = [120, 141, 8]
-    powerByteString.extend(splitMACAddress(lightMACAddress, True))
-
-    if onOrOff == "ON":
-        powerByteString.extend([129, 1])
-    else:
-        powerByteString.extend([129, 0])
-
-    return powerByteString
-
 def translateByteString(customValue = None):
     if customValue == None:
         customValue = sendValue
 
     translatedByteString = {}
 
-    if customValue[1] == 129: # we're turning the light on or off
-        if customValue[3] == 1:
-            translatedByteString["colorMode"] = "ON"
-        elif customValue[3] == 2:
-            translatedByteString["colorMode"] = "OFF"
-    elif customValue[1] == 134: # we're in HSI mode
-        translatedByteString["colorMode"] = "HSI"
-        translatedByteString["hue"] = customValue[3] + (256 * customValue[4])
-        translatedByteString["saturation"] = customValue[5]
-        translatedByteString["brightness"] = customValue[6]
-    elif customValue[1] == 135: # we're in CCT mode
-        translatedByteString["colorMode"] = "CCT"
-        translatedByteString["brightness"] = customValue[3]
-        translatedByteString["temp"] = customValue[4]
-        translatedByteString["GM"] = customValue[5]
-    elif customValue[1] == 136: # we're in FX/ANM/SCENE mode
-        FX = customValue[3]
-
-        translatedByteString["colorMode"] = "ANM"
-        translatedByteString["effect"] = FX
-
-        if FX == 1:
-            translatedByteString["brightness"] = customValue[4]
-            translatedByteString["temp"] = customValue[5]
-            translatedByteString["speed"] = customValue[6]
-        elif FX == 2 or FX == 3 or FX == 6 or FX == 8:
-            translatedByteString["brightness"] = customValue[4]
-            translatedByteString["temp"] = customValue[5]
-            translatedByteString["GM"] = customValue[6]
-            translatedByteString["speed"] = customValue[7]
-        elif FX == 4:
-            translatedByteString["brightness"] = customValue[4]
-            translatedByteString["temp"] = customValue[5]
-            translatedByteString["speed"] = customValue[6]
-        elif FX == 5:
-            translatedByteString["bright_min"] = customValue[4]
-            translatedByteString["bright_max"] = customValue[5]
-            translatedByteString["temp"] = customValue[6]
-            translatedByteString["GM"] = customValue[7]
-            translatedByteString["speed"] = customValue[8]
-        elif FX == 7 or FX == 9:
-            translatedByteString["brightness"] = customValue[4]
-            translatedByteString["hue"] = customValue[5] + (256 * customValue[6])
-            translatedByteString["saturation"] = customValue[7]
-            translatedByteString["speed"] = customValue[8]
-        elif FX == 10:
-            translatedByteString["brightness"] = customValue[4]
-            translatedByteString["specialOptions"] = customValue[5]
-            translatedByteString["speed"] = customValue[6]
-        elif FX == 11:
-            translatedByteString["bright_min"] = customValue[4]
-            translatedByteString["bright_max"] = customValue[5]
-            translatedByteString["temp"] = customValue[6]
-            translatedByteString["GM"] = customValue[7]
-            translatedByteString["speed"] = customValue[8]
-            translatedByteString["sparks"] = customValue[9]
-        elif FX == 12:
-            translatedByteString["brightness"] = customValue[4]
-            translatedByteString["hue_min"] = customValue[5] + (256 * customValue[6])
-            translatedByteString["hue_max"] = customValue[7] + (256 * customValue[8])
-            translatedByteString["speed"] = customValue[9]
-        elif FX == 13:
-            translatedByteString["brightness"] = customValue[4]
-            translatedByteString["temp_min"] = customValue[5]
-            translatedByteString["temp_max"] = customValue[6]
-            translatedByteString["speed"] = customValue[7]
-        elif FX == 14:
-            loopMode = customValue[4] # get whether we're in CCT or HSI mode with loopMode
-
-            translatedByteString["bright_min"] = customValue[5]
-            translatedByteString["bright_max"] = customValue[6]
-    
-            if loopMode == 0: # if we're in CCT mode
-                translatedByteString["temp"] = customValue[9]
-            else: # we're in HSI mode
-                translatedByteString["hue"] = customValue[7] + (256 * customValue[8]) # convert this from 2 values
-
-            translatedByteString["speed"] = customValue[10]
-        elif FX == 15:
-            translatedByteString["bright_min"] = customValue[4]
-            translatedByteString["bright_max"] = customValue[5]
-            translatedByteString["temp"] = customValue[6]
-            translatedByteString["GM"] = customValue[7]
-            translatedByteString["speed"] = customValue[8]
-        elif FX == 16:
-            translatedByteString["brightness"] = customValue[4]
-            translatedByteString["specialOptions"] = customValue[5]
-            translatedByteString["speed"] = customValue[6]
-            translatedByteString["sparks"] = customValue[7]
-        elif FX == 17:
-            translatedByteString["brightness"] = customValue[4]
-            translatedByteString["specialOptions"] = customValue[5]
-            translatedByteString["speed"] = customValue[6]
+    if customValue[1] == 136: # we're in FX/ANM/SCENE mode
+        layouts = byteStringDecoders.get((136, customValue[3]), [])
+    else:
+        layouts = byteStringDecoders.get((customValue[1], None), [])
+
+    # FIND THE LAYOUT THAT MATCHES THE FIXED BYTES OF THIS BYTESTRING (IF THERE'S MORE THAN ONE FOR THIS MODE)
+    matchedLayout = None
+
+    for colorMode, layout in layouts:
+        position = 1
+
+        for byte in layout:
+            if type(byte) is int and position > 2 and position < len(customValue) and customValue[position] != byte:
+                break # this fixed byte doesn't match, so this isn't the right layout
+
+            position += 2 if byte in twoByteParameters else 1
         else:
-            if FX == 26 or FX == 29:
-                translatedByteString["brightness"] = customValue[5]
+            matchedLayout = (colorMode, layout)
+            break
+
+    if matchedLayout == None:
+        if customValue[1] == 136: # an FX we don't know the layout of, so just get the brightness
+            translatedByteString["colorMode"] = "ANM"
+            translatedByteString["effect"] = customValue[3]
+            translatedByteString["brightness"] = customValue[4]
+
+    if matchedLayout != None:
+        translatedByteString["colorMode"] = matchedLayout[0]
+
+        if matchedLayout[0] == "ANM":
+            translatedByteString["effect"] = customValue[3]
+
+        position = 1
+
+        for byte in matchedLayout[1]:
+            if type(byte) is int: # skip over the fixed bytes
+                position += 1
+            elif byte in twoByteParameters:
+                if position + 1 < len(customValue):
+                    translatedByteString[byte] = customValue[position] + (256 * customValue[position + 1]) # convert this from 2 values
+
+                position += 2
             else:
-                translatedByteString["brightness"] = customValue[4]
+                if position < len(customValue):
+                    translatedByteString[byte] = customValue[position]
+
+                position += 1
 
     return translatedByteString
     
@@ -3304,83 +3541,492 @@ class UpdatedBLEInformation:
         self.address = address # the MAC address (or in the case of MacOS, the GUID)
         self.rssi = rssi # the signal level of this device
         self.HWMACaddr = HWMACaddr # the exact MAC address (needed for MacOS) of this device
+        self.device = None # the Bleak device found when scanning (linking with this skips Bleak having to scan for the light again)
+
+    # THE HARDWARE MAC ADDRESS IS ALSO KEPT AS A LIST OF BYTES (HWMACbytes), WHICH INFINITY LIGHTS NEED IN EVERY COMMAND
+    # SENT TO THEM - SO IT'S ONLY SPLIT UP AND CONVERTED ONCE, WHEN THE ADDRESS CHANGES, AND NOT ON EVERY WRITE
+    @property
+    def HWMACaddr(self):
+        return self._HWMACaddr
+
+    @HWMACaddr.setter
+    def HWMACaddr(self, HWMACaddr):
+        self._HWMACaddr = HWMACaddr
+
+        if HWMACaddr == None:
+            self.HWMACbytes = None
+        else:
+            self.HWMACbytes = tuple(splitMACAddress(HWMACaddr, True))
         
-# FIND NEW LIGHTS
-async def findDevices(limitToDevices = None):
+# ============================================== SIMULATED LIGHTS ==============================================
+# STAND-INS FOR BleakScanner AND BleakClient THAT RUN INSIDE THE PROGRAM, SO EVERYTHING CAN BE TRIED OUT (OR LOAD-TESTED WITH LOTS
+# OF LIGHTS) WITHOUT ANY REAL LIGHTS OR A BLUETOOTH ADAPTER - TO USE THEM, SET simulatedLights IN THE PREFERENCES FILE (OR CALL
+# setUpSimulator), AND THAT MANY LIGHTS OF EACH KIND IN simulatedLightModels ADVERTISE THEMSELVES, LINK AND TAKE COMMANDS LIKE REAL ONES
+BLEScanner = BleakScanner # the classes used to scan for and link to lights (replaced by the simulated ones below when simulating)
+BLEClient = BleakClient
+
+simulatedLightModels = ["NEEWER-RGB660", "NEEWER-SNL660", "NW-20220057", "NEEWER-CL124"] # an older light, an older CCT-only light, an Infinity light and an Infinity-protocol hybrid
+simulatedLightList = [] # every simulated light
+simulatedLightsByAddress = {} # the simulated lights, keyed by MAC address (upper case)
+
+simulatorSettings = {
+    "advertiseInterval": 0.1, # how often (in seconds) each light that isn't linked advertises itself
+    "RSSIRange": [-90, -40], # the range of signal levels the lights are placed at (and each reading varies by a few dB from that)
+    "connectLatency": [0.1, 0.5], # the shortest and longest time (in seconds) linking to a light takes
+    "connectFailure": 0.05, # the chance of an attempt at linking to a light failing
+    "writeLatency": 0.002, # how long (in seconds) each write takes
+    "packetLoss": 0.02, # the chance of a write getting lost (writes with response raise an error, writes without just vanish)
+    "dropChance": 0.0005, # the chance of a light dropping its link after any write
+    "notifyLatency": 0.02 # how long (in seconds) a light takes to reply to a power/channel query
+}
+
+class SimulatedLight:
+    def __init__(self, name, address, rssi):
+        self.name = name # the name the light advertises (NW-20220057, etc.)
+        self.address = address # the light's MAC address
+        self.rssi = rssi # the light's signal level (before each reading's variation)
+        self.client = None # the simulated client linked to this light (None if it isn't linked)
+        self.isOn = True # whether or not the light is turned on
+        self.channel = 1 # the light's channel
+        self.lastCommand = None # the last command written to the light (and not lost)
+        self.commandsReceived = 0 # how many commands have been written to the light (and not lost)
+
+    # TAKE A COMMAND WRITTEN TO THE LIGHT, AND RETURN THE NOTIFY REPLY FOR IT (OR None IF THE COMMAND DOESN'T GET ONE)
+    def takeCommand(self, command):
+        self.lastCommand = command
+        self.commandsReceived += 1
+
+        if command[1] == 129: # older-style power command
+            self.isOn = command[3] == 1
+        elif command[1] == 141 and len(command) > 10 and command[9] == 129: # Infinity-style power command
+            self.isOn = command[10] == 1
+        elif command[1] == 133: # the power status query
+            return tagChecksum([120, 2, 1, 1 if self.isOn else 2])
+        elif command[1] == 132: # the channel query
+            return tagChecksum([120, 1, 1, self.channel])
+
+        return None
+
+    # DROP THIS LIGHT'S LINK (AS IF IT WENT OUT OF RANGE, OR WAS POWERED OFF AT THE SWITCH)
+    # (this can be called from any thread, as the link is dropped on the asyncio loop, like Bleak does)
+    def dropLink(self):
+        if self.client != None:
+            if asyncioEventLoop != None:
+                asyncioEventLoop.call_soon_threadsafe(self.client.linkDropped)
+            else: # the asyncio loop isn't running in its own thread (if the simulator is used outside of the program), so drop it right away
+                self.client.linkDropped()
+
+class SimulatedBLEDevice: # what a simulated scan finds (laid out like Bleak's BLEDevice)
+    def __init__(self, name, address, rssi):
+        self.name = name
+        self.address = address
+        self.rssi = rssi # (older versions of Bleak keep the signal level here)
+
+class SimulatedAdvertisementData: # (laid out like Bleak's AdvertisementData)
+    def __init__(self, local_name, rssi):
+        self.local_name = local_name
+        self.rssi = rssi
+
+class SimulatedBLEScanner:
+    def __init__(self, detection_callback = None, **kwargs):
+        self.detection_callback = detection_callback
+        self.scanTask = None
+
+    async def start(self):
+        self.scanTask = asyncio.ensure_future(self.listen())
+
+    async def stop(self):
+        if self.scanTask != None:
+            self.scanTask.cancel()
+            self.scanTask = None
+
+    async def listen(self):
+        while True:
+            for light in simulatedLightList:
+                if light.client == None: # lights only advertise themselves when nothing is linked to them
+                    rssi = light.rssi + random.randint(-3, 3)
+
+                    if self.detection_callback != None:
+                        self.detection_callback(SimulatedBLEDevice(light.name, light.address, rssi), SimulatedAdvertisementData(light.name, rssi))
+
+            await asyncio.sleep(simulatorSettings["advertiseInterval"])
+
+class SimulatedBLEClient:
+    def __init__(self, address_or_ble_device, disconnected_callback = None, **kwargs):
+        if type(address_or_ble_device) is str:
+            self.address = address_or_ble_device
+        else:
+            self.address = address_or_ble_device.address
+
+        self.disconnected_callback = disconnected_callback
+        self.is_connected = False
+        self.notifyCallback = None # the function to hand notify replies to
+
+    async def connect(self, **kwargs):
+        light = simulatedLightsByAddress.get(self.address.upper(), None)
+        await asyncio.sleep(random.uniform(*simulatorSettings["connectLatency"]))
+
+        if light == None:
+            raise Exception(f"Device with address {self.address} was not found")
+
+        if light.client != None and light.client is not self:
+            raise Exception(f"Device with address {self.address} is already linked to something else")
+
+        if random.random() < simulatorSettings["connectFailure"]:
+            raise Exception(f"Couldn't link to device with address {self.address}")
+
+        light.client = self
+        self.is_connected = True
+        return True
+
+    async def disconnect(self):
+        if self.is_connected == True:
+            self.linkDropped()
+
+        return True
+
+    async def start_notify(self, char_specifier, callback, **kwargs):
+        if self.is_connected == False:
+            raise Exception("Not connected")
+
+        self.notifyCallback = callback
+
+    async def stop_notify(self, char_specifier):
+        self.notifyCallback = None
+
+    async def write_gatt_char(self, char_specifier, data, response = False):
+        if self.is_connected == False:
+            raise Exception("Not connected")
+
+        await asyncio.sleep(simulatorSettings["writeLatency"])
+
+        if random.random() < simulatorSettings["packetLoss"]: # the write got lost on the way to the light
+            if response == True:
+                raise Exception("The light didn't acknowledge the write")
+
+            return
+
+        light = simulatedLightsByAddress[self.address.upper()]
+        reply = light.takeCommand(bytes(data))
+
+        if reply != None and self.notifyCallback != None:
+            asyncio.get_event_loop().call_later(simulatorSettings["notifyLatency"], self.notifyCallback, char_specifier, bytearray(reply))
+
+        if random.random() < simulatorSettings["dropChance"]:
+            self.linkDropped()
+
+    def linkDropped(self):
+        light = simulatedLightsByAddress.get(self.address.upper(), None)
+
+        if light != None and light.client is self:
+            light.client = None
+
+        self.is_connected = False
+        self.notifyCallback = None
+
+        if self.disconnected_callback != None:
+            self.disconnected_callback(self)
+
+# MAKE lightsPerModel SIMULATED LIGHTS OF EACH KIND IN simulatedLightModels, AND USE THEM INSTEAD OF REAL LIGHTS FROM NOW ON
+def setUpSimulator(lightsPerModel):
+    global BLEScanner, BLEClient, discoveryCacheFile
+
+    simulatedLightList.clear()
+    simulatedLightsByAddress.clear()
+
+    for a in range(len(simulatedLightModels)):
+        for b in range(lightsPerModel):
+            address = f"5E:1A:00:{a:02X}:{b >> 8:02X}:{b & 255:02X}" # (locally administered addresses, so they can't clash with real lights)
+            simulatedLight = SimulatedLight(simulatedLightModels[a], address, random.randint(*simulatorSettings["RSSIRange"]))
+
+            simulatedLightList.append(simulatedLight)
+            simulatedLightsByAddress[address] = simulatedLight
+
+    BLEScanner = SimulatedBLEScanner
+    BLEClient = SimulatedBLEClient
+    discoveryCacheFile = discoveryCacheFile.replace(".prefs", "-simulated.prefs") # (so the simulated lights aren't remembered as real ones)
+
+    printDebugString(f"Using {len(simulatedLightList)} simulated lights instead of real ones")
+
+# FIND NEW LIGHTS - each light is added to the list as soon as it's first heard from, and if lightFound is given, it's called
+# with each light found (and whether or not it's a new one) so the light can be shown/linked to without waiting for the scan to finish
+async def findDevices(limitToDevices = None, lightFound = None, scanTime = 5):
+    global availableLights, scanLock, scansWaiting
+
+    if scanLock == None: # only one scan can run at a time (the GUI and HTTP requests can all ask for one at once)
+        scanLock = asyncio.Lock()
+
+    scansWaiting += 1 # (the background RSSI scan won't start listening again until this is back to 0)
+
+    if passiveScanPause != None: # if the background RSSI scan is running, ask it to step aside for this scan
+        passiveScanPause.set()
+
+    try:
+        async with scanLock:
+            return await findDevicesScan(limitToDevices, lightFound, scanTime)
+    finally:
+        scansWaiting -= 1
+
+# KEEP LISTENING FOR THE LIGHTS IN THE LIST IN THE BACKGROUND, AND KEEP THEIR SIGNAL LEVELS (AND WHEN THEY WERE LAST HEARD FROM) UP TO DATE
+# (THE SCAN IS STOPPED WHENEVER findDevices WANTS TO SCAN, AND STARTED AGAIN ONCE NO MORE SCANS ARE WAITING TO RUN)
+async def passiveScan(updateGUI = True):
+    global scanLock, passiveScanPause, passiveScanStop
+
+    if scanLock == None:
+        scanLock = asyncio.Lock()
+
+    passiveScanPause = asyncio.Event()
+    passiveScanStop = asyncio.Event()
+    bleak_ver = ilm.version('bleak').split(".") # the version of Bleak that we're using
+    printDebugString("Listening for lights in the background to keep their signal levels up to date")
+
+    # CALLED BY BLEAK EVERY TIME A DEVICE ADVERTISES ITSELF
+    def rssiDetected(device, adv_data):
+        light = availableLights.byAddress.get(device.address.upper(), None)
+
+        if light == None: # this isn't one of our lights
+            return
+
+        if int(bleak_ver[0]) == 0 and int(bleak_ver[1]) < 19:
+            updateRSSI(light, device.rssi, updateGUI)
+        else:
+            updateRSSI(light, adv_data.rssi, updateGUI)
+
+    while passiveScanStop.is_set() == False:
+        async with scanLock:
+            if scansWaiting == 0 and passiveScanStop.is_set() == False: # if another scan is waiting for its turn, let it run first
+                passiveScanPause.clear()
+                deviceScanner = BLEScanner(detection_callback=rssiDetected)
+
+                try:
+                    await deviceScanner.start()
+
+                    try: # listen until another scan wants to run (or we're told to stop), restarting the scanner every 30 seconds
+                        await asyncio.wait_for(passiveScanPause.wait(), 30)
+                    except asyncio.TimeoutError:
+                        pass
+                    finally:
+                        await deviceScanner.stop()
+                except Exception as e:
+                    printDebugString("There was an error listening for lights in the background")
+                    printDebugString(f">> {e}")
+
+        await asyncio.sleep(1) # give any scan waiting to run the chance to start before we start listening again
+
+# STOP THE BACKGROUND RSSI SCAN (IF IT'S RUNNING), AND WAIT FOR THE SCANNER TO BE STOPPED BEFORE RETURNING
+async def stopPassiveScan():
+    if passiveScanStop == None: # the background scan was never started
+        return
+
+    passiveScanStop.set()
+    passiveScanPause.set() # (wake the scan up if it's listening right now)
+
+    async with scanLock: # the scanner is only ever running while passiveScan holds this lock, so once we have it, it's stopped
+        pass
+
+# ADD A NEW SIGNAL LEVEL READING TO A LIGHT'S (SMOOTHED) RSSI, AND UPDATE THE TABLE WITH IT EVERY FEW SECONDS AT MOST
+def updateRSSI(light, rssi, updateGUI = True):
+    lastSeenTimes[light[0].address.upper()] = time.time()
+
+    if rssi == None:
+        return
+
+    light[0].rssi = round(light[0].rssi + ((rssi - light[0].rssi) * rssiSmoothing))
+
+    if updateGUI == True and time.time() - rssiDisplayTimes.get(light.handle, 0) >= 5:
+        rssiDisplayTimes[light.handle] = time.time()
+        lightRow = availableLights.indexOf(light)
+        mainWindow.setTheTable([mainWindow.returnLightTableName(lightRow), "", "", ""], lightRow)
+
+async def findDevicesScan(limitToDevices = None, lightFound = None, scanTime = 5):
     global availableLights
 
+    reloadLightSpecsIfChanged() # so lights found on this scan use the newest light specs
+
     if limitToDevices == None:
         printDebugString("Searching for new lights...")
+        expectedAddresses = set([MAC.upper() for MAC in whiteListedMACs]) - {""} # if we have a whitelist, we can stop scanning once all of those lights are found
     else:
         printDebugString("Searching for the lights you requested...")
-    
-    currentScan = [] # add all the current scan's lights detected to a standby array (to check against the main one)
+        expectedAddresses = set([MAC.upper() for MAC in limitToDevices]) # stop scanning once all of the lights we asked for are found
 
     bleak_ver = ilm.version('bleak').split(".") # the version of Bleak that we're using
-    devices = [] # master list of found devices (changed for getting MacOS MAC addresses)
+    foundAddresses = set() # the MAC addresses/GUIDs of the lights found on this scan (so each one is only added once)
+    allLightsFound = asyncio.Event() # set once every light in expectedAddresses has been found
 
-    # after Bleak 0.19, RSSI information is stored in an Advertisement variable 
-    # instead of the BLEDevice itself, so it needs to be obtained differently!
-    if int(bleak_ver[0]) == 0 and int(bleak_ver[1]) < 19:
-        device_scan = await BleakScanner.discover() # scan all available Bluetooth devices nearby
+    # CALLED BY BLEAK EVERY TIME A DEVICE ADVERTISES ITSELF
+    def deviceDetected(device, adv_data):
+        if device.address.upper() in foundAddresses: # we've already added this light on this scan
+            return
 
-        for d in device_scan:
-            devices.append(UpdatedBLEInformation(d.name, d.address, d.rssi))
-    else: 
-        device_scan = await BleakScanner.discover(return_adv=True) # scan all available Bluetooth devices nearby and return Advertisement data
+        if limitToDevices != None and device.address.upper() not in expectedAddresses: # we're only looking for specific lights, and this isn't one of them
+            return
 
-        for device, adv_data in device_scan.values():
-            devices.append(UpdatedBLEInformation(device.name, device.address, adv_data.rssi))
-    
-    for d in devices: # go through all of the devices Bleak just found
-        if limitToDevices != None: # we're looking for devices using the CLI, so we need *specific* MAC addresses/GUIDs
-            if d.address in limitToDevices:
-                d.name = getCorrectedName(d.name)
-                currentScan.append(d)
-        else: # we're doing a normal device discovery/re-discovery scan
-            if d.address in whiteListedMACs: # if the MAC address is in the list of whitelisted addresses, add this device
-                printDebugString(f"Matching whitelisted address found - {returnMACname()} {d.address}, adding to the list")
-                d.name = getCorrectedName(d.name)
-                currentScan.append(d)
-            else: # if this device is not whitelisted, check to see if it's valid (contains "NEEWER" in the name)
-                if d.name != None:
-                    acceptedPrefixes = ["NEEWER", "NW-", "SL", "NWR"]
-
-                    for a in range(len(acceptedPrefixes)):
-                        if acceptedPrefixes[a] in d.name:
-                            d.name = getCorrectedName(d.name) # fix the "newer" light names, like NW-20220057 with their correct names, like SL90 Pro
-                            currentScan.append(d)
-                            break
-
-    for a in range(len(currentScan)): # scan the newly found NEEWER devices
-        newLight = True # initially mark this light as a "new light"
-
-        # check the "new light" against the global list
-        for b in range(len(availableLights)):
-            if currentScan[a].address == availableLights[b][0].address: # if the new light's MAC address matches one already in the global list
-                printDebugString(f"Light found! [{currentScan[a].name}] {returnMACname()} {currentScan[a].address} but it's already in the list.  It may have disconnected, so relinking might be necessary.")
-                newLight = False # then don't add another instance of it
-
-                # if we found the light *again*, it's most likely the light disconnected, so we need to link it again
-                availableLights[b][0].rssi = currentScan[a].rssi # update the RSSI information
-                availableLights[b][1] = "" # clear the Bleak connection (as it's changed) to force the light to need re-linking
-
-                break # stop checking if we've found a negative result
-
-        if newLight == True: # if this light was not found in the global list, then we need to add it
-            printDebugString(f"Found new light! [{currentScan[a].name}] {returnMACname()} {currentScan[a].address} RSSI: {currentScan[a].rssi} dBm")
-            customPrefs = getCustomLightPrefs(currentScan[a].address, currentScan[a].name)
-
-            if len(customPrefs) == 4: # we need to rename the light and set up CCT and color temp range
-                availableLights.append([currentScan[a], "", customPrefs[0], [120, 135, 2, 50, 56, 50], customPrefs[1], customPrefs[2], True, ["---", "---"], customPrefs[3]]) # add it to the global list
-            elif len(customPrefs) == 5: # same as above, but we have previously stored parameters, so add them in as well
-                availableLights.append([currentScan[a], "", customPrefs[0], customPrefs[3], customPrefs[1], customPrefs[2], True, ["---", "---"], customPrefs[4]]) # add it to the global list
+        # after Bleak 0.19, RSSI information is stored in an Advertisement variable 
+        # instead of the BLEDevice itself, so it needs to be obtained differently!
+        if int(bleak_ver[0]) == 0 and int(bleak_ver[1]) < 19:
+            d = UpdatedBLEInformation(device.name, device.address, device.rssi)
+        else:
+            d = UpdatedBLEInformation(device.name, device.address, adv_data.rssi)
+
+        d.device = device
+
+        if checkFoundDevice(d, limitToDevices) == True:
+            foundAddresses.add(d.address.upper())
+            lastSeenTimes[d.address.upper()] = time.time()
+            light, newLight = addFoundLight(d)
+
+            if lightFound != None:
+                lightFound(light, newLight)
+
+            if expectedAddresses != set() and expectedAddresses <= foundAddresses:
+                allLightsFound.set()
+
+    deviceScanner = BLEScanner(detection_callback=deviceDetected)
+    await deviceScanner.start() # start listening for Bluetooth devices nearby
+
+    try:
+        await asyncio.wait_for(allLightsFound.wait(), scanTime) # listen until either the scan time is up, or every light we're looking for is found
+        printDebugString("Every light we were looking for was found, so stopping the search early")
+    except asyncio.TimeoutError:
+        pass
+    finally:
+        await deviceScanner.stop()
+
+    if foundAddresses != set(): # remember the lights we found for the next launch
+        saveDiscoveryCache()
 
     if threadAction != "quit":
         return "" # once the device scan is over, set the threadAction to nothing
     else: # if we're requesting that we quit, then just quit
         return "quit"
 
+# CHECK WHETHER A DEVICE FOUND WHEN SCANNING IS ONE OF THE LIGHTS WE WANT (AND IF IT IS, CORRECT ITS NAME)
+def checkFoundDevice(d, limitToDevices = None):
+    if limitToDevices != None: # we're looking for devices using the CLI, so we need *specific* MAC addresses/GUIDs
+        if d.address.upper() in limitToDevices:
+            d.name = getCorrectedName(d.name)
+            return True
+    else: # we're doing a normal device discovery/re-discovery scan
+        if d.address in whiteListedMACs: # if the MAC address is in the list of whitelisted addresses, add this device
+            printDebugString(f"Matching whitelisted address found - {returnMACname()} {d.address}, adding to the list")
+            d.name = getCorrectedName(d.name)
+            return True
+        else: # if this device is not whitelisted, check to see if it's valid (contains "NEEWER" in the name)
+            if d.name != None:
+                acceptedPrefixes = ["NEEWER", "NW-", "SL", "NWR"]
+
+                for a in range(len(acceptedPrefixes)):
+                    if acceptedPrefixes[a] in d.name:
+                        d.name = getCorrectedName(d.name) # fix the "newer" light names, like NW-20220057 with their correct names, like SL90 Pro
+                        return True
+
+    return False
+
+# ADD A LIGHT FOUND WHEN SCANNING TO THE GLOBAL LIST (OR UPDATE IT IF IT'S ALREADY THERE), AND RETURN THE LIGHT AND WHETHER IT'S NEW
+def addFoundLight(foundDevice):
+    # check the "new light" against the global list
+    foundLight = availableLights.byAddress.get(foundDevice.address.upper(), None)
+
+    if foundLight != None: # if the new light's MAC address matches one already in the global list
+        printDebugString(f"Light found! [{foundDevice.name}] {returnMACname()} {foundDevice.address} but it's already in the list.  It may have disconnected, so relinking might be necessary.")
+
+        # if we found the light *again*, it's most likely the light disconnected, so we need to link it again
+        foundLight.info.rssi = foundDevice.rssi # update the RSSI information
+        foundLight.info.device = foundDevice.device # and the Bleak device to link with
+
+        # (unless it's still linked, like a light from the discovery cache, or it's being linked to right now)
+        if foundLight.client == "" or (not foundLight.client.is_connected and foundLight.handle not in linkingLights):
+            foundLight.client = "" # clear the Bleak connection (as it's changed) to force the light to need re-linking
+        return foundLight, False
+    else: # if this light was not found in the global list, then we need to add it
+        printDebugString(f"Found new light! [{foundDevice.name}] {returnMACname()} {foundDevice.address} RSSI: {foundDevice.rssi} dBm")
+        customPrefs = getCustomLightPrefs(foundDevice.address, foundDevice.name)
+
+        if len(customPrefs) == 4: # we need to rename the light and set up CCT and color temp range
+            availableLights.append(Light(foundDevice, "", customPrefs[0], [120, 135, 2, 50, 56, 50], customPrefs[1], customPrefs[2], True, ["---", "---"], customPrefs[3])) # add it to the global list
+        elif len(customPrefs) == 5: # same as above, but we have previously stored parameters, so add them in as well
+            availableLights.append(Light(foundDevice, "", customPrefs[0], customPrefs[3], customPrefs[1], customPrefs[2], True, ["---", "---"], customPrefs[4])) # add it to the global list
+
+        return availableLights[-1], True
+
+# ADD THE LIGHTS FOUND ON EARLIER SCANS (IN THE LAST discoveryCacheAge HOURS) TO THE LIST, SO THEY CAN BE LINKED TO
+# WITHOUT SCANNING FIRST - RETURNS THE NUMBER OF LIGHTS ADDED
+def loadDiscoveryCache():
+    if discoveryCacheAge == 0 or not os.path.exists(discoveryCacheFile):
+        return 0
+
+    printDebugString("Loading the lights found on earlier scans from the discovery cache...")
+    lightsAdded = 0
+
+    with open(discoveryCacheFile, mode="r", encoding="utf-8") as fileToOpen:
+        cachedLights = fileToOpen.read().splitlines()
+
+    for cachedLight in cachedLights: # each line is MAC address/GUID|real name|hardware MAC address|RSSI|time last seen
+        cachedLight = cachedLight.split("|")
+
+        try:
+            if len(cachedLight) != 5 or time.time() - float(cachedLight[4]) > discoveryCacheAge * 3600: # the entry is broken or too old, so skip it
+                continue
+
+            cachedDevice = UpdatedBLEInformation(cachedLight[1], cachedLight[0], int(cachedLight[3]), (cachedLight[2] if cachedLight[2] != "" else None))
+        except ValueError:
+            continue
+
+        if availableLights.byAddress.get(cachedDevice.address.upper(), None) == None: # if the light isn't already in the list
+            cachedDevice.name = getCorrectedName(cachedDevice.realname)
+            lastSeenTimes[cachedDevice.address.upper()] = float(cachedLight[4])
+            addFoundLight(cachedDevice)
+            lightsAdded += 1
+
+    return lightsAdded
+
+# SAVE THE LIGHTS IN THE LIST (AND WHEN THEY WERE LAST FOUND) TO THE DISCOVERY CACHE FOR THE NEXT LAUNCH
+# (the lights already in the cache that haven't expired are kept, so a scan that only finds some lights doesn't forget the rest)
+def saveDiscoveryCache():
+    if discoveryCacheAge == 0:
+        return
+
+    cachedLights = {} # each light's line in the cache, keyed by MAC address/GUID (upper case)
+
+    if os.path.exists(discoveryCacheFile):
+        try:
+            with open(discoveryCacheFile, mode="r", encoding="utf-8") as fileToOpen:
+                for cachedLight in fileToOpen.read().splitlines():
+                    cachedLightInfo = cachedLight.split("|")
+
+                    try:
+                        if len(cachedLightInfo) == 5 and time.time() - float(cachedLightInfo[4]) <= discoveryCacheAge * 3600:
+                            cachedLights[cachedLightInfo[0].upper()] = cachedLight
+                    except ValueError:
+                        pass # the entry is broken, so don't keep it
+        except Exception as e:
+            printDebugString(f"There was an error reading the discovery cache from {discoveryCacheFile}, so starting a new one")
+            printDebugString(f">> {e}")
+
+    for light in availableLights:
+        if light[0].address.upper() in lastSeenTimes:
+            cachedLights[light[0].address.upper()] = "|".join([light[0].address, light[0].realname, (light[0].HWMACaddr if light[0].HWMACaddr != None else ""), \
+                                                               str(light[0].rssi), str(lastSeenTimes[light[0].address.upper()])])
+
+    try:
+        createLightPrefsFolder() # create the light_prefs folder if it doesn't exist
+
+        with open(discoveryCacheFile, mode="w", encoding="utf-8") as cacheFileToWrite:
+            cacheFileToWrite.write("\n".join(cachedLights.values()))
+    except Exception as e:
+        printDebugString(f"There was an error saving the discovery cache to {discoveryCacheFile}")
+        printDebugString(f">> {e}")
+
+# LINK TO THE LIGHTS FROM THE DISCOVERY CACHE (IF WE'RE SET TO), WHILE SCANNING IN THE BACKGROUND TO REFRESH THEM (FOR THE HTTP SERVER)
+async def linkToCachedLights():
+    if autoConnectToLights == True:
+        linkTask = asyncio.ensure_future(parallelAction("connect", [-1], False)) # (a cached light that's out of range shouldn't hold up the scan)
+        await findDevices()
+        await linkTask
+    else:
+        await findDevices()
+
 def getCustomLightPrefs(MACAddress, lightName = ""):
     customPrefsPath = splitMACAddress(MACAddress)
     customPrefsPath = os.path.dirname(os.path.abspath(sys.argv[0])) + os.sep + "light_prefs" + os.sep + "".join(customPrefsPath)
@@ -3430,93 +4076,225 @@ def getCustomLightPrefs(MACAddress, lightName = ""):
     else: # if there is no custom preferences file, still check the name against a list of per-light parameters
         return getLightSpecs(lightName) # get the factory default settings for this light
 
+# THE MODEL CODES IN THE NAMES "NEWER" LIGHTS ADVERTISE WITH (NW-20220057, ETC.), AND THE LIGHTS' ACTUAL NAMES
+defaultNewLightNames = [
+    ["20200015", "RGB1"], ["20200037", "SL90"], ["20200049", "RGB1200"], ["20210006", "Apollo 150D"],
+    ["20210007", "RGB C80"], ["20210012", "CB60 RGB"], ["20210018", "BH-30S RGB"], ["20210034", "MS60B"],
+    ["20210035", "MS60C"], ["20210036", "TL60 RGB"], ["20210037", "CB200B"], ["20220014", "CB60B"],
+    ["20220016", "PL60C"], ["20220035", "MS150B"], ["20220041", "AS600B"], ["20220043", "FS150B"],
+    ["20220046", "RP19C"],  ["20220051", "CB100C"],  ["20220055", "CB300B"], ["20220057", "SL90 Pro"],
+    ["20230021", "BH-30S RGB"], ["20230022", "HS60B"], ["20230025", "RGB1200"], ["20230031", "TL120C"],
+    ["20230050", "FS230 5600K"], ["20230051", "FS230B"], ["20230052", "FS150 5600K"], ["20230064", "TL60 RGB"],
+    ["20230080", "MS60C"], ["20230092", "RGB1200"], ["20230108", "HB80C"]
+]
+
+# 3-18-24 - re-arranged the list of lights in alphabetical order 
+# to reduce parsing complexity at finding the light -- STRUCTURE:
+# NAME, CCT Temp Min, CCT Temp Max, CCT Only, Infinity Mode*
+# * (0 - normal, 1 - infinity, 2 - infinity *protocol*, but not Infinity *light*)
+defaultNeewerLightList = [
+    ["Apollo", 5600, 5600, True, 0],
+    ["BH-30S RGB", 2500, 10000, False, 1],
+    ["CB60 RGB", 2500, 6500, False, 1],
+    ["CL124", 2500, 10000, False, 2],
+    ["GL1", 2900, 7000, True, 0],
+    ["GL1C", 2900, 7000, False, 1],
+    ["HB80C", 2500, 7500, False, 1],
+    ["MS60B", 2700, 6500, True, 1],
+    ["NL140", 3200, 5600, True, 0],
+    ["RGB C80", 2500, 10000, False, 1],
+    ["RGB CB60", 2500, 10000, False, 1],
+    ["RGB1", 3200, 5600, False, 1],
+    ["RGB1000", 2500, 10000, False, 1],
+    ["RGB1200", 2500, 10000, False, 1],
+    ["RGB140", 2500, 10000, False, 1],
+    ["RGB168", 2500, 8500, False, 2],
+    ["RGB176", 3200, 5600, False, 0],
+    ["RGB176 A1", 2500, 10000, False, 0],
+    ["RGB18", 3200, 5600, False, 0],
+    ["RGB190", 3200, 5600, False, 0],
+    ["RGB450", 3200, 5600, False, 0],
+    ["RGB480", 3200, 5600, False, 0],
+    ["RGB512", 2500, 10000, False, 1],
+    ["RGB530", 3200, 5600, False, 0],
+    ["RGB530PRO", 3200, 5600, False, 0],
+    ["RGB650", 3200, 5600, False, 0],
+    ["RGB660", 3200, 5600, False, 0],
+    ["RGB660PRO", 3200, 5600, False, 0],
+    ["RGB800", 2500, 10000, False, 1],
+    ["RGB960", 3200, 5600, False, 0],
+    ["RGB-P200", 3200, 5600, False, 0],
+    ["RGB-P280", 3200, 5600, False, 0],
+    ["SL70", 3200, 8500, False, 0],
+    ["SL80", 3200, 8500, False, 0],
+    ["SL90", 2500, 10000, False, 1],
+    ["SL90 Pro", 2500, 10000, False, 1],
+    ["SNL1320", 3200, 5600, True, 0],
+    ["SNL1920", 3200, 5600, True, 0],
+    ["SNL480", 3200, 5600, True, 0],
+    ["SNL530", 3200, 5600, True, 0],
+    ["SNL660", 3200, 5600, True, 0],
+    ["SNL960", 3200, 5600, True, 0],
+    ["SRP16", 3200, 5600, True, 0],
+    ["SRP18", 3200, 5600, True, 0],
+    ["TL60", 2500, 10000, False, 1],
+    ["WRP18", 3200, 5600, True, 0],
+    ["ZK-RY", 5600, 5600, False, 0],
+    ["ZRP16", 3200, 5600, True, 0]
+]
+
+# THE TWO LISTS ABOVE (PLUS ANY ADDITIONS FROM lightSpecsFiles, SEE loadLightSpecs), AND THOSE LISTS BUILT INTO LOOKUP TABLES
+# BY buildLightIndexes() SO A NAME DOESN'T NEED TO BE CHECKED AGAINST EVERY ENTRY
+newLightNames = [entry[:] for entry in defaultNewLightNames]
+masterNeewerLightList = [entry[:] for entry in defaultNeewerLightList]
+lightSpecsFileTimes = {} # when each of the lightSpecsFiles was last changed (as of the last time they were loaded)
+newLightNamesIndex = {} # model code -> [position in newLightNames, corrected name]
+newLightCodeLengths = [] # the lengths of the model codes in newLightNamesIndex (to know how many characters to look up at once)
+lightSpecsTrie = {} # a tree of the names in masterNeewerLightList, one character per level - None marks the end of a name (-> [its position in the list, its specs])
+correctedNameCache = {} # advertised name -> corrected name
+lightSpecsCache = {} # light name -> [CCT Temp Min, CCT Temp Max, CCT Only, Infinity Mode] (or None if the light isn't in the list)
+
+# (the tables are built separately, then swapped in all at once, so lookups happening at the same time see either the old or new tables)
+def buildLightIndexes():
+    global newLightNamesIndex, newLightCodeLengths, lightSpecsTrie, correctedNameCache, lightSpecsCache
+    newNamesIndex = {}
+    newSpecsTrie = {}
+
+    for a in range(len(newLightNames)):
+        if newLightNames[a][0] not in newNamesIndex: # (if a code is in the list twice, the first one wins)
+            newNamesIndex[newLightNames[a][0]] = [a, newLightNames[a][1]]
+
+    for a in range(len(masterNeewerLightList)):
+        currentBranch = newSpecsTrie
+
+        for character in masterNeewerLightList[a][0]:
+            currentBranch = currentBranch.setdefault(character, {})
+
+        currentBranch[None] = [a, masterNeewerLightList[a][1:]] # (if a name is in the list twice, the last one wins)
+
+    newLightNamesIndex, newLightCodeLengths, lightSpecsTrie = newNamesIndex, sorted(set([len(code) for code in newNamesIndex])), newSpecsTrie
+    correctedNameCache, lightSpecsCache = {}, {}
+
+buildLightIndexes()
+
+# LOAD THE LIGHT SPECS FROM lightSpecsFiles ON TOP OF THE BUILT-IN LISTS ABOVE (ENTRIES WITH THE SAME NAME/MODEL CODE REPLACE THE
+# BUILT-IN ONES, NEW ONES ARE ADDED TO THE END), AND REBUILD THE LOOKUP TABLES - THE FILES LOOK LIKE THIS (BOTH SECTIONS ARE OPTIONAL):
+# {"modelCodes": {"20230108": "HB80C"}, "lights": {"HB80C": {"CCTRange": [2500, 7500], "CCTOnly": false, "infinityMode": 1}}}
+# (CCT-only lights can also have a "settleDelay" - how many milliseconds they need between the brightness and color temperature writes)
+def loadLightSpecs():
+    global newLightNames, masterNeewerLightList
+    loadedLightNames = [entry[:] for entry in defaultNewLightNames]
+    loadedLightList = [entry[:] for entry in defaultNeewerLightList]
+    lightSpecsFileTimes.clear()
+
+    for lightSpecsFile in lightSpecsFiles:
+        if not os.path.exists(lightSpecsFile):
+            continue
+
+        lightSpecsFileTimes[lightSpecsFile] = os.path.getmtime(lightSpecsFile)
+
+        try:
+            with open(lightSpecsFile, mode="r", encoding="utf-8") as fileToOpen:
+                lightSpecs = json.load(fileToOpen)
+
+            for code, lightName in lightSpecs.get("modelCodes", {}).items():
+                addLightSpec(loadedLightNames, [str(code), str(lightName)])
+
+            for lightName, lightSpec in lightSpecs.get("lights", {}).items():
+                CCTRange = lightSpec.get("CCTRange", [3200, 5600])
+                newEntry = [str(lightName), int(CCTRange[0]), int(CCTRange[1]), bool(lightSpec.get("CCTOnly", False)), \
+                            testValid("infinityMode", lightSpec.get("infinityMode", 0), 0, 0, 2)]
+
+                if "settleDelay" in lightSpec: # this light's measured settle delay (in milliseconds) between split CCT writes
+                    newEntry.append(testValid("settleDelay", lightSpec["settleDelay"], CCTSettleDelay, 0, 500))
+
+                addLightSpec(loadedLightList, newEntry)
+
+            printDebugString(f"Loaded light specifications from {lightSpecsFile}")
+        except Exception as e:
+            printDebugString(f"There was an error loading light specifications from {lightSpecsFile}, so skipping it")
+            printDebugString(f">> {e}")
+
+    newLightNames, masterNeewerLightList = loadedLightNames, loadedLightList
+    buildLightIndexes()
+
+# ADD AN ENTRY TO ONE OF THE LIGHT SPEC LISTS, OR REPLACE THE ENTRY WITH THE SAME NAME/MODEL CODE
+def addLightSpec(listToChange, newEntry):
+    for a in range(len(listToChange)):
+        if listToChange[a][0] == newEntry[0]:
+            listToChange[a] = newEntry
+            return
+
+    listToChange.append(newEntry)
+
+# RE-LOAD THE LIGHT SPECS IF ANY OF lightSpecsFiles HAVE BEEN ADDED, CHANGED OR REMOVED SINCE THEY WERE LAST LOADED
+def reloadLightSpecsIfChanged():
+    currentFileTimes = {}
+
+    for lightSpecsFile in lightSpecsFiles:
+        if os.path.exists(lightSpecsFile):
+            currentFileTimes[lightSpecsFile] = os.path.getmtime(lightSpecsFile)
+
+    if currentFileTimes != lightSpecsFileTimes:
+        printDebugString("The light specification files have changed, so re-loading them")
+        loadLightSpecs()
+
 # GET A MORE CORRECT VERSION OF THE NEWER LIGHT NAMES
 def getCorrectedName(lightName):
-    newLightNames = [
-        ["20200015", "RGB1"], ["20200037", "SL90"], ["20200049", "RGB1200"], ["20210006", "Apollo 150D"],
-        ["20210007", "RGB C80"], ["20210012", "CB60 RGB"], ["20210018", "BH-30S RGB"], ["20210034", "MS60B"],
-        ["20210035", "MS60C"], ["20210036", "TL60 RGB"], ["20210037", "CB200B"], ["20220014", "CB60B"],
-        ["20220016", "PL60C"], ["20220035", "MS150B"], ["20220041", "AS600B"], ["20220043", "FS150B"],
-        ["20220046", "RP19C"],  ["20220051", "CB100C"],  ["20220055", "CB300B"], ["20220057", "SL90 Pro"],
-        ["20230021", "BH-30S RGB"], ["20230022", "HS60B"], ["20230025", "RGB1200"], ["20230031", "TL120C"],
-        ["20230050", "FS230 5600K"], ["20230051", "FS230B"], ["20230052", "FS150 5600K"], ["20230064", "TL60 RGB"],
-        ["20230080", "MS60C"], ["20230092", "RGB1200"], ["20230108", "HB80C"]
-    ]
+    if lightName == None:
+        return lightName
 
-    for a in range(len(newLightNames)):
-        if newLightNames[a][0] in lightName:
-            lightName = newLightNames[a][1]
-            break
+    nameCache, namesIndex = correctedNameCache, newLightNamesIndex # (in case the tables are swapped out while we're looking)
+
+    if lightName not in nameCache:
+        foundName = [math.inf, lightName] # if none of the model codes are in the name, keep the name as-is
+
+        # LOOK UP EVERY PART OF THE NAME THAT'S AS LONG AS A MODEL CODE (IF MORE THAN ONE CODE IS IN THE NAME, THE ONE EARLIEST IN THE LIST WINS)
+        for codeLength in newLightCodeLengths:
+            for a in range(len(lightName) - codeLength + 1):
+                codeFound = namesIndex.get(lightName[a:a + codeLength], None)
+
+                if codeFound != None and codeFound[0] < foundName[0]:
+                    foundName = codeFound
+
+        nameCache[lightName] = foundName[1]
 
-    return lightName
+    return nameCache[lightName]
 
 # RETURN THE DEFAULT FACTORY SPECIFICATIONS FOR LIGHTS
 def getLightSpecs(lightName, returnParam = "all") -> list:
-    # 3-18-24 - re-arranged the list of lights in alphabetical order 
-    # to reduce parsing complexity at finding the light -- STRUCTURE:
-    # NAME, CCT Temp Min, CCT Temp Max, CCT Only, Infinity Mode*
-    # * (0 - normal, 1 - infinity, 2 - infinity *protocol*, but not Infinity *light*)
-    masterNeewerLightList = [
-        ["Apollo", 5600, 5600, True, 0],
-        ["BH-30S RGB", 2500, 10000, False, 1],
-        ["CB60 RGB", 2500, 6500, False, 1],
-        ["CL124", 2500, 10000, False, 2],
-        ["GL1", 2900, 7000, True, 0],
-        ["GL1C", 2900, 7000, False, 1],
-        ["HB80C", 2500, 7500, False, 1],
-        ["MS60B", 2700, 6500, True, 1],
-        ["NL140", 3200, 5600, True, 0],
-        ["RGB C80", 2500, 10000, False, 1],
-        ["RGB CB60", 2500, 10000, False, 1],
-        ["RGB1", 3200, 5600, False, 1],
-        ["RGB1000", 2500, 10000, False, 1],
-        ["RGB1200", 2500, 10000, False, 1],
-        ["RGB140", 2500, 10000, False, 1],
-        ["RGB168", 2500, 8500, False, 2],
-        ["RGB176", 3200, 5600, False, 0],
-        ["RGB176 A1", 2500, 10000, False, 0],
-        ["RGB18", 3200, 5600, False, 0],
-        ["RGB190", 3200, 5600, False, 0],
-        ["RGB450", 3200, 5600, False, 0],
-        ["RGB480", 3200, 5600, False, 0],
-        ["RGB512", 2500, 10000, False, 1],
-        ["RGB530", 3200, 5600, False, 0],
-        ["RGB530PRO", 3200, 5600, False, 0],
-        ["RGB650", 3200, 5600, False, 0],
-        ["RGB660", 3200, 5600, False, 0],
-        ["RGB660PRO", 3200, 5600, False, 0],
-        ["RGB800", 2500, 10000, False, 1],
-        ["RGB960", 3200, 5600, False, 0],
-        ["RGB-P200", 3200, 5600, False, 0],
-        ["RGB-P280", 3200, 5600, False, 0],
-        ["SL70", 3200, 8500, False, 0],
-        ["SL80", 3200, 8500, False, 0],
-        ["SL90", 2500, 10000, False, 1],
-        ["SL90 Pro", 2500, 10000, False, 1],
-        ["SNL1320", 3200, 5600, True, 0],
-        ["SNL1920", 3200, 5600, True, 0],
-        ["SNL480", 3200, 5600, True, 0],
-        ["SNL530", 3200, 5600, True, 0],
-        ["SNL660", 3200, 5600, True, 0],
-        ["SNL960", 3200, 5600, True, 0],
-        ["SRP16", 3200, 5600, True, 0],
-        ["SRP18", 3200, 5600, True, 0],
-        ["TL60", 2500, 10000, False, 1],
-        ["WRP18", 3200, 5600, True, 0],
-        ["ZK-RY", 5600, 5600, False, 0],
-        ["ZRP16", 3200, 5600, True, 0]
-    ]
-    
+    specsCache, specsTrie = lightSpecsCache, lightSpecsTrie # (in case the tables are swapped out while we're looking)
+
+    if lightName not in specsCache:
+        foundSpec = [-1, None] # the position in masterNeewerLightList of the light found, and its specs
+        foundLength = 0 # how long the name of the light found is
+
+        # FIND EVERY NAME IN THE LIST THAT'S IN THE LIGHT'S NAME (STARTING AT EACH CHARACTER OF THE LIGHT'S NAME) - IF MORE THAN ONE IS,
+        # THE LONGEST ONE WINS (SO "SL90 Pro" IS FOUND INSTEAD OF "SL90", "RGB1200" INSTEAD OF "RGB1", ETC.), AND IF THERE'S MORE THAN
+        # ONE OF THE SAME LENGTH, THE ONE LATEST IN THE LIST WINS
+        for a in range(len(lightName)):
+            currentBranch = specsTrie
+
+            for b in range(a, len(lightName)):
+                currentBranch = currentBranch.get(lightName[b], None)
+
+                if currentBranch == None:
+                    break
+
+                if None in currentBranch:
+                    if b + 1 - a > foundLength or (b + 1 - a == foundLength and currentBranch[None][0] > foundSpec[0]):
+                        foundSpec = currentBranch[None]
+                        foundLength = b + 1 - a
+
+        specsCache[lightName] = foundSpec[1]
+
     customPrefs = ["", [3200, 5600], False, False] # the default list of preferences
+    foundSpec = specsCache[lightName]
 
-    for a in reversed(range(len(masterNeewerLightList))): # scan the list of preset specs above to find the current light in them
-        # check the master list to see if the current light is found - if it is, then change the prefs to reflect the light's spec
-        if lightName.find(masterNeewerLightList[a][0]) != -1:
-            # customPrefs[0] = masterNeewerLightList[a][0] # the name of the light (for testing purposes)
-            customPrefs[1] = [masterNeewerLightList[a][1], masterNeewerLightList[a][2]] # the HSI color temp range
-            customPrefs[2] = masterNeewerLightList[a][3] # whether or not to allow RGB commands
-            customPrefs[3] = masterNeewerLightList[a][4] # whether or not this light uses Infinity mode
-            break # stop looking for lights if we found it!
+    if foundSpec != None: # if the light was found in the list, then change the prefs to reflect the light's spec
+        customPrefs[1] = [foundSpec[0], foundSpec[1]] # the HSI color temp range
+        customPrefs[2] = foundSpec[2] # whether or not to allow RGB commands
+        customPrefs[3] = foundSpec[3] # whether or not this light uses Infinity mode
 
     if returnParam == "all": # we want to return all information (the default)
         return customPrefs
@@ -3526,52 +4304,90 @@ def getLightSpecs(lightName, returnParam = "all") -> list:
         return customPrefs[2]
     elif returnParam == "Infinity": # we only want to return the Infinity mode for this light
         return customPrefs[3]
+    elif returnParam == "settle": # we only want to return how long (in seconds) to wait between split CCT writes to this light
+        if foundSpec != None and len(foundSpec) > 4: # the light's specs have their own settle delay
+            return foundSpec[4] / 1000
+        else:
+            return CCTSettleDelay / 1000
 
-# CONNECT (LINK) TO A LIGHT
+# CONNECT (LINK) TO A LIGHT - while this runs, the light is in linkingLights (so a scan finding it again doesn't pull the link out from under it)
 async def connectToLight(selectedLight, updateGUI=True):
+    lightHandle = availableLights[selectedLight].handle
+    linkingLights.add(lightHandle)
+
+    try:
+        return await tryLinkingToLight(selectedLight, updateGUI)
+    finally:
+        linkingLights.discard(lightHandle)
+
+async def tryLinkingToLight(selectedLight, updateGUI=True):
     global availableLights
     isConnected = False # whether or not the light is connected
     returnValue = "" # the value to return to the thread (in GUI mode, a string) or True/False (in CLI mode, a boolean value)
 
-    lightName = availableLights[selectedLight][0].name # the Name of the light (for status updates)
-    lightMAC = availableLights[selectedLight][0].address # the MAC address of the light (to keep track of the light even if the index number changes)
+    light = availableLights[selectedLight] # the light itself (to keep track of the light even if the index number changes)
+    lightName = light[0].name # the Name of the light (for status updates)
+    lightMAC = light[0].address # the MAC address of the light
 
-    lightIdx = returnLightIndexesFromMacAddress(lightMAC)[0]
     createNewBleakInstance = False
+    unlinkRequested.discard(light.handle) # we want to be linked to this light now
 
     # CHECK TO SEE IF A BLEAK OBJECT EXISTS
-    if availableLights[lightIdx][1] == "":
+    if light[1] == "":
         createNewBleakInstance = True
     else: # if the object exists, but nothing is connected to it, then make a new instance
-        if not availableLights[lightIdx][1].is_connected:
+        if not light[1].is_connected:
             createNewBleakInstance = True
 
     if createNewBleakInstance == True: # FILL THE [1] ELEMENT OF THE availableLights ARRAY WITH A NEW BLEAK CONNECTION OBJECT
-        availableLights[lightIdx][1] = BleakClient(availableLights[lightIdx][0].address)
-        await asyncio.sleep(0.25) # wait just a short time before trying to connect
+        lightHandle = light.handle
+        if light[0].device != None: # if we have the device Bleak found when scanning, link to it directly (so Bleak doesn't need to scan for it again)
+            bleakDevice = light[0].device
+        else: # otherwise, Bleak will need to find the light by its MAC address/GUID before linking to it
+            bleakDevice = light[0].address
+
+        light[1] = BLEClient(bleakDevice, disconnected_callback=lambda client: lightDisconnected(lightHandle, client, updateGUI))
 
     # TRY TO CONNECT TO THE LIGHT SEVERAL TIMES BEFORE GIVING UP THE LINK
+    # (WAITING A BIT LONGER AFTER EACH FAILED ATTEMPT, AND A RANDOM AMOUNT OF THAT WAIT, SO LIGHTS LINKED AT THE SAME TIME DON'T ALL RETRY AT ONCE)
     currentAttempt = 1
+    retryDelay = connectRetryDelays[0] # how long to wait before the next attempt
+    giveUpTime = time.time() + connectDeadline # when to stop trying to link to this light
 
     while isConnected == False and currentAttempt <= maxNumOfAttempts:
         if threadAction != "quit":
             try:
-                if not availableLights[lightIdx][1].is_connected: # if the current device isn't linked to Bluetooth
+                if not light[1].is_connected: # if the current device isn't linked to Bluetooth
                     printDebugString(f"Attempting to link to light [{lightName}] {returnMACname()} {lightMAC} (Attempt {currentAttempt} of {maxNumOfAttempts})")
-                    isConnected = await availableLights[lightIdx][1].connect() # try connecting it (and return the connection status)
+                    attemptTimeout = max(0.1, min(connectTimeout, giveUpTime - time.time())) # don't let this attempt run past the deadline
+                    isConnected = await asyncio.wait_for(light[1].connect(), attemptTimeout) # try connecting it (and return the connection status)
                 else:
                     isConnected = True # the light is already connected, so mark it as being connected
             except Exception as e:
                 printDebugString(f"Error linking to light [{lightName}] {returnMACname()} {lightMAC}")
-              
-                if updateGUI == True:
-                    if currentAttempt < maxNumOfAttempts:
-                        mainWindow.setTheTable(["", "", "NOT\nLINKED", f"There was an error connecting to the light, trying again (Attempt {currentAttempt + 1} of {maxNumOfAttempts}...)"], lightIdx) # there was an issue connecting this specific light to Bluetooth, so show that
-                else:
-                    returnValue = False # if we're in CLI mode, and there is an error connecting to the light, return False
 
+                if type(e) is asyncio.TimeoutError:
+                    printDebugString(f">> The light didn't link within {connectTimeout} seconds")
+
+            if isConnected == False: # the attempt didn't work, so see if we should try again
                 currentAttempt = currentAttempt + 1
-                await asyncio.sleep(4) # wait a few seconds before trying to link to the light again
+                timeToWait = retryDelay / 2 + random.uniform(0, retryDelay / 2) # wait somewhere between half and all of the current delay
+                outOfTime = time.time() + timeToWait >= giveUpTime # whether the next attempt would start after the deadline
+
+                if currentAttempt > maxNumOfAttempts or outOfTime == True: # we're out of attempts (or time), so give up
+                    if outOfTime == True:
+                        printDebugString(f"Giving up on linking to light [{lightName}] {returnMACname()} {lightMAC} after {connectDeadline} seconds")
+
+                    if updateGUI == False:
+                        returnValue = False # if we're in CLI mode, and there is an error connecting to the light, return False
+
+                    break
+
+                if updateGUI == True:
+                    mainWindow.setTheTable(["", "", "NOT\nLINKED", f"There was an error connecting to the light, trying again (Attempt {currentAttempt} of {maxNumOfAttempts}...)"], availableLights.indexOf(light)) # there was an issue connecting this specific light to Bluetooth, so show that
+
+                await asyncio.sleep(timeToWait) # wait a little bit before trying to link to the light again
+                retryDelay = min(retryDelay * 2, connectRetryDelays[1]) # and wait longer the next time, up to the longest wait
         else:
             return "quit"
 
@@ -3581,80 +4397,108 @@ async def connectToLight(selectedLight, updateGUI=True):
         if isConnected == True:
             printDebugString(f"Successful link on light [{lightName}] {returnMACname()} {lightMAC}")
 
-            if availableLights[selectedLight][8] == 1: # we're an Infnity light, we need the physical MAC address
+            if light[8] == 1: # we're an Infnity light, we need the physical MAC address
                 printDebugString(f"Checking for Hardware MAC address on Infinity light [{lightName}] {returnMACname()} {lightMAC}")
 
-                if platform.system() == "Darwin": # we're on MacOS, so this needs a little finesse...
+                if platform.system() == "Darwin" and BLEClient is BleakClient: # we're on MacOS (with real lights), so this needs a little finesse...
                     # run the System Profiler and get the Bluetooth specific devices
                     command = ["system_profiler", "SPBluetoothDataType"]
                     output = run(command, stdout=PIPE, universal_newlines=True)
                     # get the location in the above output dealing with the specific light we're working with
-                    light_offset = output.stdout.find(availableLights[selectedLight][0].realname)
+                    light_offset = output.stdout.find(light[0].realname)
                     # find the address adjacent from the above location
                     address_offset = output.stdout.find("Address: ", light_offset)
                     # clip out the MAC address itself
                     output_parse = output.stdout[address_offset + 9:address_offset + 26]
 
-                    availableLights[selectedLight][0].HWMACaddr = output_parse
+                    light[0].HWMACaddr = output_parse
                 else: # we're on a system that uses MAC addresses, so just duplicate the information
-                    availableLights[selectedLight][0].HWMACaddr = availableLights[selectedLight][0].address
+                    light[0].HWMACaddr = light[0].address
                 
-                printDebugString(f">> Found Hardware MAC address: {availableLights[selectedLight][0].HWMACaddr}")
+                printDebugString(f">> Found Hardware MAC address: {light[0].HWMACaddr}")
+                availableLights.updateIndexes(light) # so the light can also be found by its hardware MAC address
+                saveDiscoveryCache() # and remember the hardware MAC address for next time
 
             if updateGUI == True:
-                mainWindow.setTheTable(["", "", "LINKED", "Waiting to send..."], lightIdx) # if it's successful, show that in the table
+                clearNotifications(light) # any notifications we were reading were from an earlier connection
+                await subscribeToNotifications(light) # start reading notifications now, so the light's status can be checked later on
+                mainWindow.setTheTable(["", "", "LINKED", "Waiting to send..."], availableLights.indexOf(light)) # if it's successful, show that in the table
             else:
                 returnValue = True  # if we're in CLI mode, and there is no error connecting to the light, return True
         else:
             if updateGUI == True:
-                mainWindow.setTheTable(["", "", "NOT\nLINKED", "There was an error connecting to the light"], lightIdx) # there was an issue connecting this specific light to Bluetooh, so show that
+                mainWindow.setTheTable(["", "", "NOT\nLINKED", "There was an error connecting to the light"], availableLights.indexOf(light)) # there was an issue connecting this specific light to Bluetooh, so show that
 
             returnValue = False # the light is not connected
 
     return returnValue # once the connection is over, then return either True or False (for CLI) or nothing (for GUI)
 
-async def readNotifyCharacteristic(selectedLight, diagCommand, typeOfData):
-    # clear the global variable before asking the light for info
-    global receivedData
-    receivedData = ""
+# START READING NOTIFICATIONS FROM A LIGHT (IF WE AREN'T ALREADY) - THIS STAYS ON FOR AS LONG AS THE LIGHT IS LINKED, SO
+# ASKING A LIGHT FOR INFORMATION IS JUST ONE WRITE, AND THE REPLY IS HANDED TO WHOEVER IS WAITING ON THAT KIND OF REPLY
+async def subscribeToNotifications(light):
+    if notifySubscriptions.get(light.handle, None) is light[1]: # we're already reading from this connection
+        return True
+
+    lightHandle = light.handle
+    lightCallback = lambda sender, data: notifyCallback(lightHandle, data) # so the callback knows which light the data came from
 
     try:
-        await availableLights[selectedLight][1].start_notify(notifyLightUUID, notifyCallback) # start reading notifications from the light
+        await light[1].start_notify(notifyLightUUID, lightCallback) # start reading notifications from the light
     except Exception as e:
-        try: # if we've resorted the list, there is a possibility of a hanging callback, so this will raise an exception
-            await availableLights[selectedLight][1].stop_notify(notifyLightUUID) # so we need to try disconnecting first
+        try: # if there's a hanging callback from an earlier connection, this will raise an exception
+            await light[1].stop_notify(notifyLightUUID) # so we need to try disconnecting first
             await asyncio.sleep(0.5) # wait a little bit of time before re-connecting to the callback
-            await availableLights[selectedLight][1].start_notify(notifyLightUUID, notifyCallback) # try again to start reading notifications from the light
-        except Exception as e: # if we truly can't connect to the callback, return a blank string
-            return "" # if there is an error starting the characteristic scan, just quit out of this routine
+            await light[1].start_notify(notifyLightUUID, lightCallback) # try again to start reading notifications from the light
+        except Exception as e: # if we truly can't connect to the callback, then we can't read from this light
+            return False
+
+    notifySubscriptions[light.handle] = light[1]
+    return True
+
+# FORGET A LIGHT'S NOTIFICATIONS (WHEN IT'S UNLINKED), AND LET ANYONE STILL WAITING ON A REPLY KNOW THERE WON'T BE ONE
+def clearNotifications(light):
+    notifySubscriptions.pop(light.handle, None)
+
+    for waiters in notifyWaiters.pop(light.handle, {}).values():
+        for waiter in waiters:
+            if not waiter.done():
+                waiter.set_result("")
+
+async def readNotifyCharacteristic(selectedLight, diagCommand, typeOfData):
+    light = availableLights[selectedLight] # the light itself (to keep track of the light even if the index number changes)
+
+    if await subscribeToNotifications(light) == False:
+        return "" # if there is an error starting the characteristic scan, just quit out of this routine
+
+    # WAIT FOR THIS KIND OF REPLY FROM THIS LIGHT (MORE THAN ONE LIGHT, OR MORE THAN ONE KIND OF REPLY, CAN BE WAITED ON AT ONCE)
+    reply = asyncio.get_event_loop().create_future()
+    notifyWaiters.setdefault(light.handle, {}).setdefault(typeOfData, []).append(reply)
 
-    for a in range(maxNumOfAttempts): # attempt maxNumOfAttempts times to read the characteristics
-        try:
-            await availableLights[selectedLight][1].write_gatt_char(setLightUUID, bytearray(diagCommand))
-        except Exception as e:
-            return "" # if there is an error checking the characteristic, just quit out of this routine
-
-        if receivedData != "": # if the recieved data is populated
-            if len(receivedData) > 1: # if we have enough elements to get a status from
-                if receivedData[1] == typeOfData: # if the data returned is the correct *kind* of data
-                    break # stop scanning for data
-            else: # if we have a list, but it doesn't have a payload in it (the light didn't supply enough data)
-                receivedData = "---" # then just re-set recievedData to the default string
-                break # stop scanning for data
-        else:
-            await asyncio.sleep(0.25) # wait a little bit of time before checking again
     try:
-        await availableLights[selectedLight][1].stop_notify(notifyLightUUID) # stop reading notifications from the light
-    except Exception as e:
-        pass # we will return whatever data remains from the scan, so if we can't stop the scan (light disconnected), just return what we have
+        for a in range(maxNumOfAttempts): # attempt maxNumOfAttempts times to read the characteristics
+            try:
+                await light[1].write_gatt_char(setLightUUID, bytearray(diagCommand))
+            except Exception as e:
+                return "" # if there is an error checking the characteristic, just quit out of this routine
+
+            try:
+                return await asyncio.wait_for(asyncio.shield(reply), 0.25) # wait a little bit of time for the reply before asking again
+            except asyncio.TimeoutError:
+                pass
 
-    return receivedData
+        return "" # the light never replied
+    finally:
+        waiters = notifyWaiters.get(light.handle, {}).get(typeOfData, [])
+
+        if reply in waiters:
+            waiters.remove(reply)
 
 async def getLightChannelandPower(selectedLight):
     global availableLights
     returnInfo = ["---", "---"] # the information to return to the light
+    light = availableLights[selectedLight] # the light itself (to keep track of the light even if the index number changes)
 
-    powerInfo = await readNotifyCharacteristic(selectedLight, [120, 133, 0, 253], 2)
+    powerInfo = await readNotifyCharacteristic(availableLights.indexOf(light), [120, 133, 0, 253], 2)
 
     try:
         if powerInfo != "":
@@ -3664,7 +4508,7 @@ async def getLightChannelandPower(selectedLight):
                 returnInfo[0] = "STBY"
         
             # IF THE LIGHT IS ON, THEN ATTEMPT TO READ THE CURRENT CHANNEL
-            chanInfo = await readNotifyCharacteristic(selectedLight, [120, 132, 0, 252], 1)
+            chanInfo = await readNotifyCharacteristic(availableLights.indexOf(light), [120, 132, 0, 252], 1)
 
             if chanInfo != "": # if we got a result from the query
                 try:
@@ -3674,42 +4518,58 @@ async def getLightChannelandPower(selectedLight):
     except IndexError:
         # if we have an IndexError (the information returned isn't blank, but also isn't enough to descipher the status)
         # then just error out, but print the information that *was* returned for debugging purposes
-        printDebugString(f"We don't have enough information from light [{availableLights[selectedLight][0].name}] to get the status.")
+        printDebugString(f"We don't have enough information from light [{light[0].name}] to get the status.")
         printDebugString(f">> {powerInfo}")
 
-    availableLights[selectedLight][7][0] = returnInfo[0]
+    light[7][0] = returnInfo[0]
+
+    if light[1] != "---" and returnInfo[1] != "---":
+        light[7][1] = returnInfo[1]
 
-    if availableLights[selectedLight][1] != "---" and returnInfo[1] != "---":
-        availableLights[selectedLight][7][1] = returnInfo[1]
+def notifyCallback(lightHandle, data):
+    lightWaiters = notifyWaiters.get(lightHandle, {})
 
-def notifyCallback(sender, data):
-    global receivedData
-    receivedData = data
+    if len(data) > 1: # hand the reply to everyone waiting on this kind of reply from this light
+        waiters = lightWaiters.get(data[1], [])
+        reply = data
+    else: # the light didn't supply enough data for a payload, so let everyone waiting on this light know that
+        waiters = [waiter for kindOfReply in lightWaiters.values() for waiter in kindOfReply]
+        reply = "---"
+
+    for waiter in waiters:
+        if not waiter.done():
+            waiter.set_result(reply)
 
 # DISCONNECT FROM A LIGHT
 async def disconnectFromLight(selectedLight, updateGUI=True):
     returnValue = "" # same as above, string for GUI mode and boolean for CLI mode, default to blank string
+    light = availableLights[selectedLight] # the light itself (to keep track of the light even if the index number changes)
+
+    if light[1] != "": # if there is a Bleak object attached to the light, try to disconnect
+        unlinkRequested.add(light.handle) # we're unlinking on purpose, so don't re-link to this light in the background
+        sceneRunningLights.discard(light.handle) # the light may not be running the same scene when we link to it again
+        lastWrittenValues.pop(light.handle, None) # (or have the same value)
+        clearNotifications(light) # we won't be reading any more notifications from this connection
 
-    if availableLights[selectedLight][1] != "": # if there is a Bleak object attached to the light, try to disconnect
         try:
-            if availableLights[selectedLight][1].is_connected: # if the current light is connected
-                await availableLights[selectedLight][1].disconnect() # disconnect the selected light
+            if light[1].is_connected: # if the current light is connected
+                await light[1].disconnect() # disconnect the selected light
         except Exception as e:
             returnValue = False # if we're in CLI mode, then return False if there is an error disconnecting
 
-            printDebugString(f"Error unlinking from light {selectedLight + 1} [{availableLights[selectedLight][0].name}] {returnMACname()} {availableLights[selectedLight][0].address}")
+            printDebugString(f"Error unlinking from light {availableLights.indexOf(light) + 1} [{light[0].name}] {returnMACname()} {light[0].address}")
             printDebugString(f">> {e}")
 
         try:
-            if not availableLights[selectedLight][1].is_connected: # if the current light is NOT connected, then we're good
+            if not light[1].is_connected: # if the current light is NOT connected, then we're good
                 if updateGUI == True: # if we're using the GUI, update the display (if we're waiting)
-                    mainWindow.setTheTable(["", "", "NOT\nLINKED", "Light disconnected!"], selectedLight) # show the new status in the table
+                    mainWindow.setTheTable(["", "", "NOT\nLINKED", "Light disconnected!"], availableLights.indexOf(light)) # show the new status in the table
                 else: # if we're not, then indicate that we're good
                     returnValue = True # if we're in CLI mode, then return False if there is an error disconnecting
 
-                printDebugString(f"Successfully unlinked from light {selectedLight + 1} [{availableLights[selectedLight][0].name}] {returnMACname()} {availableLights[selectedLight][0].address}")
+                printDebugString(f"Successfully unlinked from light {availableLights.indexOf(light) + 1} [{light[0].name}] {returnMACname()} {light[0].address}")
         except AttributeError:
-            printDebugString(f"Light {selectedLight + 1} has no Bleak object attached to it, so not attempting to disconnect from it")
+            printDebugString(f"Light {availableLights.indexOf(light) + 1} has no Bleak object attached to it, so not attempting to disconnect from it")
 
     return returnValue
 
@@ -3758,187 +4618,338 @@ def convertFXIndex(infinityMode, effectNum):
         else: # we're recalling a light preset designed for older lights
             return effectNum - 20
 
-# WRITE TO A LIGHT - optional arguments for the CLI version (GUI version doesn't use either of these)
-async def writeToLight(selectedLights=0, updateGUI=True, useGlobalValue=True):
-    global availableLights
-    returnValue = "" # same as above, return value "" for GUI, or boolean for CLI
+# A PERSISTENT SEND QUEUE FOR ONE LIGHT, RUN BY THE ASYNCIO LOOP
+# Only the newest value that hasn't been sent yet is kept, so if new values come in faster than
+# the light can take them, the stale ones are dropped instead of piling up behind each other
+class LightSendQueue:
+    def __init__(self, lightHandle, lightMAC):
+        self.lightHandle = lightHandle # the handle of the light (to find it again even if the index number changes)
+        self.pendingValue = None # the newest value waiting to be sent to the light (None if there is nothing waiting)
+        self.pendingWaiters = [] # futures waiting on the pending value to be sent
+        self.newValueEvent = asyncio.Event() # set whenever a new value is waiting to be sent
+        self.idleEvent = asyncio.Event() # set whenever there is nothing left to send to this light
+        self.idleEvent.set()
+        self.lastResult = None # the WriteResult of the last write to this light
+        self.lastSendTime = 0 # when the last value was written to this light (for rate limiting)
+
+        # THE MOST VALUES PER SECOND TO SEND TO THIS LIGHT - ANYTHING FASTER GETS COALESCED DOWN TO THE NEWEST VALUE
+        if lightMAC.upper() in customSendRates:
+            self.maxSendRate = customSendRates[lightMAC.upper()]
+        else:
+            self.maxSendRate = maxSendRate
 
-    startTimer = time.time() # the start of the triggering
-    printDebugString("Going into send mode")
+        self.sendTask = asyncio.ensure_future(self.sendLoop()) # the task that sends values to the light as they come in
 
-    try:
-        if updateGUI == True:
-            if selectedLights == 0:
-                selectedLights = mainWindow.selectedLights() # get the list of currently selected lights from the GUI table
+    # QUEUE A NEW VALUE TO SEND TO THIS LIGHT, REPLACING ANY VALUE THAT HASN'T BEEN SENT YET
+    def put(self, valueToSend, updateGUI = True, useGlobalValue = True):
+        self.pendingValue = [valueToSend, updateGUI, useGlobalValue]
+
+        waiter = asyncio.get_event_loop().create_future() # resolved once this value (or a newer one) has been sent
+        self.pendingWaiters.append(waiter)
+        self.idleEvent.clear()
+        self.newValueEvent.set()
+
+        return waiter
+
+    async def sendLoop(self):
+        while True:
+            await self.newValueEvent.wait() # wait until there is something to send
+
+            # WAIT OUT THE REST OF THIS LIGHT'S RATE LIMIT BEFORE SENDING - IF NEW VALUES COME IN WHILE WE WAIT,
+            # THEY REPLACE THE PENDING ONE, SO WE ALWAYS SEND THE NEWEST VALUE (AND THE LAST ONE IS NEVER DROPPED)
+            if self.maxSendRate > 0:
+                timeToWait = self.lastSendTime + (1 / self.maxSendRate) - time.time()
+
+                if timeToWait > 0:
+                    await asyncio.sleep(timeToWait)
+
+            self.newValueEvent.clear()
+
+            if self.pendingValue == None:
+                continue
+
+            valueToSend, updateGUI, useGlobalValue = self.pendingValue
+            waiters = self.pendingWaiters
+
+            self.pendingValue = None
+            self.pendingWaiters = []
+
+            light = availableLights.byHandle.get(self.lightHandle, None)
+            self.lastSendTime = time.time()
+
+            if light != None: # if the light is still in the list, then send to it
+                self.lastResult = await sendToSingleLight(light, valueToSend, updateGUI, useGlobalValue)
+            else:
+                self.lastResult = WriteResult(self.lightHandle, "removed")
+
+            for waiter in waiters: # let anyone waiting on this value know it's been sent
+                if not waiter.done():
+                    waiter.set_result(self.lastResult)
+
+            if self.pendingValue == None: # if nothing new came in while we were sending, then we're idle
+                self.idleEvent.set()
+
+# RETURN THE SEND QUEUE FOR A LIGHT, CREATING IT IF IT DOESN'T EXIST YET (THIS NEEDS TO RUN INSIDE THE ASYNCIO LOOP)
+def getSendQueue(lightIdx):
+    global sendQueueActivity
+
+    lightHandle = availableLights[lightIdx].handle
+
+    if not lightHandle in lightSendQueues:
+        lightSendQueues[lightHandle] = LightSendQueue(lightHandle, availableLights[lightIdx][0].address)
+
+    if sendQueueActivity == None:
+        sendQueueActivity = asyncio.Event()
+
+    return lightSendQueues[lightHandle]
+
+# HAND A VALUE TO THE SEND QUEUES OF A SERIES OF LIGHTS - THEY ALL SEND AT ONCE, SO ONE SLOW LIGHT DOESN'T HOLD UP THE REST
+# (if valueToSend is None, each light sends the last parameters stored for it instead, turning it on first)
+def queueSendToLights(selectedLights, valueToSend = None, updateGUI = True):
+    sendWaiters = [] # the futures to wait on for each light's send to finish
+
+    for a in range(len(selectedLights)):
+        currentLightIdx = int(selectedLights[a])
+
+        if currentLightIdx < 0 or currentLightIdx >= len(availableLights):
+            continue # the light isn't in the list (anymore), so skip it
+
+        if valueToSend == None: # we're sending the stored parameters for this light
+            sendWaiters.append(getSendQueue(currentLightIdx).put(availableLights[currentLightIdx][3][:], updateGUI, False))
         else:
-            if type(selectedLights) is int: # if we specify an integer-based index
-                selectedLights = [selectedLights] # convert asked-for light to list
+            sendWaiters.append(getSendQueue(currentLightIdx).put(valueToSend, updateGUI, True))
+
+    if sendWaiters != []:
+        sendQueueActivity.set() # let the send mode know we have a new value to send
+
+    return sendWaiters
+
+# THE RESULT OF WRITING A VALUE TO ONE LIGHT
+class WriteResult:
+    def __init__(self, lightHandle, status = "sent", latency = 0, error = "", confirmed = False):
+        self.lightHandle = lightHandle # the handle of the light written to
+        self.status = status # "sent", "unchanged" (the light already has that value), "unsupported" (the light can't use that mode), "not linked", "failed" or "removed" (the light isn't in the list anymore)
+        self.latency = latency # how long writing to the light took (in seconds)
+        self.error = error # what went wrong, if the write failed
+        self.confirmed = confirmed # whether or not the light acknowledged the write (only if it uses reliable writes)
+
+# WHETHER OR NOT THIS LIGHT'S WRITES SHOULD BE ACKNOWLEDGED BY THE LIGHT (WRITE-WITH-RESPONSE)
+def usesReliableWrites(light):
+    return customReliableWrites.get(light[0].address.upper(), reliableWrites)
+
+# WRITE ONE VALUE TO ONE LIGHT - this is the part of the send mode that each light's send queue runs
+# (the light's row in the table is looked up every time it's updated, as the list can be re-sorted while we're sending)
+async def sendToSingleLight(light, currentSendValue, updateGUI = True, useGlobalValue = True):
+    writeResult = WriteResult(light.handle) # how the write went
+    confirmWrites = usesReliableWrites(light) # whether or not to wait for the light to acknowledge each write
+    startTime = time.time()
+
+    # IF THIS LIGHT WAS SENT THE SAME VALUE RECENTLY (AND IT WENT THROUGH), THEN IT ALREADY HAS IT, SO DON'T SEND IT AGAIN
+    # (once refreshInterval is up, the value is sent again anyway, in case the light was changed some other way)
+    if useGlobalValue == True and light[1] != "" and light.handle in lastWrittenValues:
+        if lastWrittenValues[light.handle][0] == currentSendValue and time.time() - lastWrittenValues[light.handle][1] < refreshInterval:
+            writeResult.status = "unchanged"
+            return writeResult
 
-        currentSendValue = [] # initialize the value check
+    try:
+        if light[1] != "": # if a Bleak connection is there
+            try:
+                # THIS SECTION IS FOR LOADING SNAPSHOT PRESET POWER STATES
+                if useGlobalValue == False: # if we're forcing the lights to use their stored parameters, then load that in here
+                    sceneRunningLights.discard(light.handle) # (so if the stored parameters are a scene, it's started fresh)
 
-        # if there are lights selected (otherwise just dump out), and the delay timer is less than it's maximum, then try to send to the lights selected
-        while (len(selectedLights) > 0 and time.time() - startTimer < 0.4) :
-            if currentSendValue != sendValue: # if the current value is different than what was last sent to the light, then send a new one
-                currentSendValue = sendValue[:] # get this value before sending to multiple lights, to ensure the same value is sent to each one
+                    for command in encodeForLight(light[8], [120, 129, 1, 1], light[0].HWMACbytes):
+                        await light[1].write_gatt_char(setLightUUID, command, confirmWrites) # force this light to turn on
 
-                for a in range(len(selectedLights)): # try to write each light in turn, and show the current data being sent to them in the table
-                    currentLightIdx = int(selectedLights[a])
-                    
-                    # THIS SECTION IS FOR LOADING SNAPSHOT PRESET POWER STATES
-                    if useGlobalValue == False: # if we're forcing the lights to use their stored parameters, then load that in here
-                        if availableLights[currentLightIdx][8] != 1: # we're not using an Infinity light
-                            await availableLights[currentLightIdx][1].write_gatt_char(setLightUUID, bytearray([120, 129, 1, 1, 251]), False) # force this light to turn on
-                        else: # we're using an Infinity light
-                            await availableLights[currentLightIdx][1].write_gatt_char(setLightUUID, bytearray(tagChecksum(getInfinityPowerBytestring("ON", availableLights[currentLightIdx][0].HWMACaddr))), False)
-
-                        availableLights[currentLightIdx][6] = True # set the ON flag of this light to True
-                        await asyncio.sleep(0.05)
-                    
-                        currentSendValue = availableLights[currentLightIdx][3] # set the send value to set the preset downstream
-
-                    if availableLights[currentLightIdx][1] != "": # if a Bleak connection is there
-                        try:
-                            if availableLights[currentLightIdx][5] == True: # if we're using the old style of light
-                                if currentSendValue[1] == 135: # if we're on CCT mode
-                                    if CCTSlider == -1: # and we need to write both HUE and BRI to the light
-                                        splitCommands = calculateSeparateBytestrings(currentSendValue) # get both commands from the converter
-
-                                        # WRITE BOTH LUMINANCE AND HUE VALUES TOGETHER, BUT SEPARATELY
-                                        await availableLights[currentLightIdx][1].write_gatt_char(setLightUUID, bytearray(tagChecksum(splitCommands[0])), False)
-                                        await asyncio.sleep(0.05) # wait 1/20th of a second to give the Bluetooth bus a little time to recover
-                                        await availableLights[currentLightIdx][1].write_gatt_char(setLightUUID, bytearray(tagChecksum(splitCommands[1])), False)
-                                    else: # we're only writing either HUE or BRI independently
-                                        await availableLights[currentLightIdx][1].write_gatt_char(setLightUUID, bytearray(tagChecksum(calculateSeparateBytestrings(currentSendValue))), False)
-                                elif currentSendValue[1] == 129: # we're using an old light, but we're either turning the light on or off
-                                    await availableLights[currentLightIdx][1].write_gatt_char(setLightUUID, bytearray(tagChecksum(currentSendValue)), False)
-                                elif currentSendValue[1] == 134: # we can't use HSI mode with this light, so show that
-                                    if updateGUI == True:
-                                        mainWindow.setTheTable(["", "", "", "This light can not use HSI mode"], currentLightIdx)
-                                    else:
-                                        returnValue = True # we successfully wrote to the light (or tried to at least)
-                                elif currentSendValue[1] == 136: # we can't use ANM/SCENE mode with this light, so show that
-                                    if updateGUI == True:
-                                        mainWindow.setTheTable(["", "", "", "This light can not use ANM/SCENE mode"], currentLightIdx)
-                                    else:
-                                        returnValue = True # we successfully wrote to the light (or tried to at least)
-                            else: # we're using a "newer" Neewer light
-                                if availableLights[currentLightIdx][8] == 1: # we're using the newest kind of light, so we need to tweak the send value
-                                    if currentSendValue[1]  == 135: # we're in CCT mode
-                                        infinitySendValue = [120, 144, 11]
-                                    elif currentSendValue[1] == 134: # we're in HSI mode
-                                        infinitySendValue = [120, 143, 11]
-                                    elif currentSendValue[1] == 136: # we're in SCENE/FX mode
-                                        infinitySendValue = [120, 145, 6 + (len(currentSendValue) - 2)]
-                                    elif currentSendValue[1] == 129: # we need to turn the light on or off
-                                        infinitySendValue = [120, 141, 8]
-
-                                    if availableLights[currentLightIdx][8] == 1:
-                                        infinitySendValue.extend(splitMACAddress(availableLights[currentLightIdx][0].HWMACaddr, True))
-
-                                    # THE LAST 2 VALUES FOR CCT MODE ARE:
-                                    # G/M COMPENSATION (WIP)
-                                    # ...........4.  NOT REALLY SURE **WHY** IT'S 4, BUT... IT'S 4.
-                                    if currentSendValue[1]  == 135: # CCT mode
-                                        infinitySendValue.extend([currentSendValue[1],
-                                                                currentSendValue[3],
-                                                                currentSendValue[4],
-                                                                currentSendValue[5],
-                                                                4])
-                                    elif currentSendValue[1] == 134: # HSI mode
-                                        infinitySendValue.extend([currentSendValue[1],
-                                                                currentSendValue[3],
-                                                                currentSendValue[4],
-                                                                currentSendValue[5],
-                                                                currentSendValue[6]])
-                                    elif currentSendValue[1] == 136: # SCENE/FX mode
-                                        infinitySendValue.append(139)
-                                        infinitySendValue.append(convertFXIndex(True, currentSendValue[3]))
-                                                                                
-                                        for i in range(4, len(currentSendValue)):
-                                            infinitySendValue.append(currentSendValue[i])
-
-                                        # CYCLE POWER TO INFINITY LIGHT BEFORE SENDING THE ANIMATION PARAMETERS
-                                        await availableLights[currentLightIdx][1].write_gatt_char(setLightUUID, bytearray(tagChecksum(getInfinityPowerBytestring("OFF", availableLights[currentLightIdx][0].HWMACaddr))), False)
-                                        await asyncio.sleep(0.05)
-                                        await availableLights[currentLightIdx][1].write_gatt_char(setLightUUID, bytearray(tagChecksum(getInfinityPowerBytestring("ON", availableLights[currentLightIdx][0].HWMACaddr))), False)
-                                        await asyncio.sleep(0.05)
-                                    elif currentSendValue[1] == 129: # we need to turn the light on or off
-                                        infinitySendValue.extend([129, currentSendValue[3]])
-
-                                    await availableLights[currentLightIdx][1].write_gatt_char(setLightUUID, bytearray(tagChecksum(infinitySendValue)), False)
-                                else:
-                                    if currentSendValue[1] == 135: # you're in CCT mode
-                                        if availableLights[currentLightIdx][8] == 0: # you're using an old-style Neewer light
-                                            await availableLights[currentLightIdx][1].write_gatt_char(setLightUUID, bytearray(tagChecksum(currentSendValue[0:5])), False)
-                                        elif availableLights[currentLightIdx][8] == 2: # you're using an Infinity-protocol hybrid
-                                            valueToSend = currentSendValue[:]
-                                            valueToSend[2] = 3 # this light requires 3 parameters
-
-                                            await availableLights[currentLightIdx][1].write_gatt_char(setLightUUID, bytearray(tagChecksum(valueToSend)), False)
-                                    elif currentSendValue[1] == 136: # if we're in ANM/scene mode, we need to convert the Infinity command back to a normal command
-                                        if availableLights[currentLightIdx][8] == 0:
-                                            valueToSend = currentSendValue[0:5]
-                                            
-                                            # SWITCH THE 2 ELEMENTS TO THE CORRECT ORDER FOR OLDER LIGHTS
-                                            currentEffect = valueToSend[3]
-                                            valueToSend[3] = valueToSend[4]
-                                            valueToSend[4] = convertFXIndex(False, currentEffect)
-
-                                            await availableLights[currentLightIdx][1].write_gatt_char(setLightUUID, bytearray(tagChecksum(valueToSend)), False)
-                                        elif availableLights[currentLightIdx][8] == 2:
-                                            valueToSend = currentSendValue[:]
-                                            valueToSend[1] = 139 # change the mode to Inifnity-style FX mode
-                                            valueToSend[2] = len(valueToSend) - 3 # there are (total - 3) parameters in this command
-
-                                            await availableLights[currentLightIdx][1].write_gatt_char(setLightUUID, bytearray(tagChecksum(valueToSend)), False)
-                                    else:
-                                        await availableLights[currentLightIdx][1].write_gatt_char(setLightUUID, bytearray(tagChecksum(currentSendValue)), False)
+                    light[6] = True # set the ON flag of this light to True
+                    await asyncio.sleep(0.05)
 
-                            if updateGUI == True:
-                                # if we're not looking at an old light, or if we are, we're not in either HSI or ANM modes, then update the status of that light
-                                if not (availableLights[currentLightIdx][5] == True and (currentSendValue[1] == 134 or currentSendValue[1] == 136)):
-                                    if currentSendValue[1] != 129: # if we're not turning the light on or off
-                                        mainWindow.setTheTable(["", "", "", updateStatus(splitString="\n", infinityMode=availableLights[currentLightIdx][8], customValue=currentSendValue)], currentLightIdx)
-                                    else: # we ARE turning the light on or off
-                                        if currentSendValue[3] == 1: # we turned the light on
-                                            availableLights[currentLightIdx][6] = True # toggle the "light on" parameter of this light to ON
+                if light[5] == True: # if we're using the old style of light, brightness and color temperature are sent separately
+                    commandsToSend = encodeForLight(-1, currentSendValue)
+                    settleDelay = getLightSpecs(light[0].name, "settle") # how long this model needs between the 2 writes
+                else: # we're using a "newer" Neewer light
+                    # IF THIS LIGHT IS ALREADY RUNNING A SCENE, DON'T CYCLE ITS POWER BEFORE SENDING THE NEXT ONE
+                    commandsToSend = encodeForLight(light[8], currentSendValue, light[0].HWMACbytes, light.handle not in sceneRunningLights)
+                    settleDelay = None # use the delays built into the commands
 
-                                            changeStatus = mainWindow.returnTableInfo(currentLightIdx, 2).replace("STBY", "ON")
-                                            mainWindow.setTheTable(["", "", changeStatus, "Light turned on"], currentLightIdx)
+                sceneRunningLights.discard(light.handle) # (if this write fails part way, the light's mode isn't known anymore)
+                lastWrittenValues.pop(light.handle, None)
 
-                                        else: # we turned the light off
-                                            availableLights[currentLightIdx][6] = False # toggle the "light on" parameter of this light to OFF
+                if commandsToSend == None: # we can't use this mode (HSI or ANM/SCENE) with this light, so show that
+                    writeResult.status = "unsupported"
 
-                                            changeStatus = mainWindow.returnTableInfo(currentLightIdx, 2).replace("ON", "STBY")
-                                            mainWindow.setTheTable(["", "", changeStatus, "Light turned off\nA long period of inactivity may require a re-link to the light"], currentLightIdx)
-                            else:
-                                returnValue = True # we successfully wrote to the light
-
-                            availableLights[currentLightIdx][3] = currentSendValue # store the currenly sent value to recall later
-                        except Exception as e:
-                            if updateGUI == True:
-                                mainWindow.setTheTable(["", "", "", "Error Sending to light!"], currentLightIdx)
-                    else: # if there is no Bleak object associated with this light (otherwise, it's been found, but not linked)
-                        if updateGUI == True:
-                            mainWindow.setTheTable(["", "", "", "Light isn't linked yet, can't send to it"], currentLightIdx)
+                    if updateGUI == True:
+                        mainWindow.setTheTable(["", "", "", "This light can not use " + ("HSI" if currentSendValue[1] == 134 else "ANM/SCENE") + " mode"], availableLights.indexOf(light))
+                else:
+                    for command in commandsToSend:
+                        if type(command) is float: # wait between commands to give the Bluetooth bus a little time to recover
+                            if settleDelay == None:
+                                await asyncio.sleep(command)
+                            elif settleDelay > 0: # (each light waits on its own, so the other lights' writes go out while this one settles)
+                                await asyncio.sleep(settleDelay)
                         else:
-                            returnValue = 0 # the light is not linked, even though it *should* be if it gets to this point, so this is an odd error
+                            await light[1].write_gatt_char(setLightUUID, command, confirmWrites)
 
-                if useGlobalValue == True:
-                    startTimer = time.time() # if we sent a value, then reset the timer
-                else:
-                    break # don't do the loop again (as we just want to send the commands once instead of look for newly selected lights)
+                    writeResult.confirmed = confirmWrites # if we waited on the light to acknowledge every write (and none failed), then it has them
+
+                if updateGUI == True:
+                    # if we're not looking at an old light, or if we are, we're not in either HSI or ANM modes, then update the status of that light
+                    if not (light[5] == True and (currentSendValue[1] == 134 or currentSendValue[1] == 136)):
+                        if currentSendValue[1] != 129: # if we're not turning the light on or off
+                            mainWindow.setTheTable(["", "", "", updateStatus(splitString="\n", infinityMode=light[8], customValue=currentSendValue)], availableLights.indexOf(light))
+                        else: # we ARE turning the light on or off
+                            if currentSendValue[3] == 1: # we turned the light on
+                                light[6] = True # toggle the "light on" parameter of this light to ON
+
+                                changeStatus = mainWindow.returnTableInfo(availableLights.indexOf(light), 2).replace("STBY", "ON")
+                                mainWindow.setTheTable(["", "", changeStatus, "Light turned on"], availableLights.indexOf(light))
+
+                            else: # we turned the light off
+                                light[6] = False # toggle the "light on" parameter of this light to OFF
+
+                                changeStatus = mainWindow.returnTableInfo(availableLights.indexOf(light), 2).replace("ON", "STBY")
+                                mainWindow.setTheTable(["", "", changeStatus, "Light turned off\nA long period of inactivity may require a re-link to the light"], availableLights.indexOf(light))
+
+                if commandsToSend != None and currentSendValue[1] == 136 and light[5] == False:
+                    sceneRunningLights.add(light.handle) # this light is now running a scene
+
+                if commandsToSend != None:
+                    lastWrittenValues[light.handle] = [currentSendValue[:], time.time()] # the light has this value now
+
+                light[3] = currentSendValue # store the currenly sent value to recall later
+            except Exception as e:
+                writeResult.status = "failed"
+                writeResult.error = str(e)
 
-            await asyncio.sleep(0.05) # wait 1/20th of a second to give the Bluetooth bus a little time to recover
+                if updateGUI == True:
+                    mainWindow.setTheTable(["", "", "", "Error Sending to light!"], availableLights.indexOf(light))
+        else: # if there is no Bleak object associated with this light (otherwise, it's been found, but not linked)
+            writeResult.status = "not linked"
 
             if updateGUI == True:
-                selectedLights = mainWindow.selectedLights() # re-acquire the current list of selected lights
+                mainWindow.setTheTable(["", "", "", "Light isn't linked yet, can't send to it"], availableLights.indexOf(light))
     except Exception as e:
-        printDebugString(f"There was an error communicating with light {currentLightIdx + 1} [{availableLights[currentLightIdx][0].name}] {returnMACname()} {availableLights[currentLightIdx][0].address}")
+        printDebugString(f"There was an error communicating with light {availableLights.indexOf(light) + 1} [{light[0].name}] {returnMACname()} {light[0].address}")
         printDebugString(f">> {e}")
 
-        if updateGUI == True:
-            returnValue = False # there was an error writing to this light, so return false to the CLI
+        writeResult.status = "failed"
+        writeResult.error = str(e)
+
+    writeResult.latency = time.time() - startTime
+    return writeResult
+
+# WRITE TO A SERIES OF LIGHTS AT ONCE, AND RETURN HOW IT WENT FOR EACH ONE (A LIST OF WriteResults, IN THE SAME ORDER AS selectedLights)
+# (if valueToSend is None, each light is turned on, and sent the last parameters stored for it)
+# If writing to any of the lights fails, those lights (and only those) are written to again, up to retries more times
+async def bulkWrite(selectedLights, valueToSend = None, updateGUI = False, retries = 0):
+    if valueToSend != None:
+        valueToSend = valueToSend[:] # (so the value can't change under us while we're sending it)
+
+    writeResults = list(await asyncio.gather(*queueSendToLights(selectedLights, valueToSend, updateGUI)))
+
+    for attempt in range(retries):
+        failedHandles = [writeResult.lightHandle for writeResult in writeResults if writeResult.status == "failed"]
+
+        if failedHandles == []: # every write went through, so we don't need to try again
+            break
+
+        await asyncio.sleep(0.1 * (attempt + 1)) # give the lights (and the Bluetooth bus) a little time to recover first
+        printDebugString(f"Retrying {len(failedHandles)} light(s) that couldn't be written to (Attempt {attempt + 1} of {retries})...")
+
+        retryResults = await asyncio.gather(*queueSendToLights(returnLightIndexesFromHandles(failedHandles), valueToSend, updateGUI))
+        retryResults = {writeResult.lightHandle: writeResult for writeResult in retryResults}
+
+        for a in range(len(writeResults)):
+            writeResults[a] = retryResults.get(writeResults[a].lightHandle, writeResults[a])
+
+    for writeResult in writeResults:
+        lastWriteResults[writeResult.lightHandle] = writeResult # (so the HTTP server can show how the last write to each light went)
+
+    return writeResults
+
+# HOW A WRITE TO A LIGHT WENT, AS TEXT (FOR THE HTTP SERVER)
+def returnWriteResultText(writeResult):
+    if writeResult.status == "sent" or writeResult.status == "unchanged":
+        return f"{writeResult.status} ({round(writeResult.latency * 1000)} ms)"
+    elif writeResult.error != "":
+        return f"{writeResult.status} ({writeResult.error})"
+    else:
+        return writeResult.status
+
+# SHOW THE RESULTS OF A bulkWrite IN THE CONSOLE, AND RETURN THE NUMBER OF LIGHTS THAT WEREN'T WRITTEN TO
+def reportWriteResults(writeResults):
+    failedWrites = 0
+
+    for writeResult in writeResults:
+        if writeResult.status != "sent" and writeResult.status != "unchanged":
+            failedWrites += 1
+            light = availableLights.byHandle.get(writeResult.lightHandle, None)
+
+            if light != None:
+                printDebugString(f"Couldn't write to light [{light[0].name}] {returnMACname()} {light[0].address} ({writeResult.status})")
+            else:
+                printDebugString(f"Couldn't write to light #{writeResult.lightHandle} ({writeResult.status})")
+
+            if writeResult.error != "":
+                printDebugString(f">> {writeResult.error}")
+
+    if writeResults != []:
+        printDebugString(f"Wrote to {len(writeResults) - failedWrites} of {len(writeResults)} light(s) (slowest took {round(max([writeResult.latency for writeResult in writeResults]) * 1000)} ms)")
+
+    return failedWrites
+
+# WAIT UNTIL EVERY SEND QUEUE HAS GONE QUIET FOR idleTime SECONDS (NO NEW VALUES COMING IN FROM THE GUI)
+async def waitForSendsToSettle(idleTime):
+    if sendQueueActivity == None: # nothing has been queued to send yet
+        return
+
+    while threadAction != "quit":
+        sendQueueActivity.clear()
+
+        try:
+            await asyncio.wait_for(sendQueueActivity.wait(), idleTime)
+        except asyncio.TimeoutError:
+            break # nothing new has come in, so we're done
+
+    # DON'T LEAVE SEND MODE UNTIL EVERY LIGHT HAS FINISHED WRITING THE LAST VALUE IT WAS GIVEN
+    await asyncio.gather(*[sendQueue.idleEvent.wait() for sendQueue in lightSendQueues.values()])
+
+# WRITE TO A LIGHT - optional arguments for the CLI version (GUI version doesn't use either of these)
+async def writeToLight(selectedLights=0, updateGUI=True, useGlobalValue=True, valueToSend=None):
+    returnValue = "" # same as above, return value "" for GUI, or boolean for CLI
+
+    printDebugString("Going into send mode")
+
+    if updateGUI == True:
+        if selectedLights == 0:
+            selectedLights = mainWindow.selectedLights() # get the list of currently selected lights from the GUI table
+    else:
+        if type(selectedLights) is int: # if we specify an integer-based index
+            selectedLights = [selectedLights] # convert asked-for light to list
+
+    if len(selectedLights) > 0: # if there are lights selected (otherwise just dump out)
+        if valueToSend != None: # send a specific value to every light (so requests from other threads don't need to share sendValue)
+            sendWaiters = queueSendToLights(selectedLights, valueToSend[:], updateGUI)
+        elif useGlobalValue == True:
+            sendWaiters = queueSendToLights(selectedLights, sendValue[:], updateGUI) # send the same value to every light
+        else:
+            sendWaiters = queueSendToLights(selectedLights, None, updateGUI) # send the value stored in each light to that light
+
+        if updateGUI == True and useGlobalValue == True:
+            # STAY IN SEND MODE WHILE THE GUI IS STILL HANDING NEW VALUES TO THE SEND QUEUES (FROM startSend)
+            await waitForSendsToSettle(0.4)
+
+        sendResults = await asyncio.gather(*sendWaiters) # wait for every light to finish writing the value it was given
+
+        if updateGUI == False and sendResults != []: # report an error if writing to any of the lights failed, not just the last one
+            sendStatuses = [sendResult.status for sendResult in sendResults]
+
+            if "failed" in sendStatuses:
+                returnValue = False
+            elif all(sendStatus == "not linked" or sendStatus == "removed" for sendStatus in sendStatuses): # none of the lights could be written to
+                returnValue = 0
+            else:
+                returnValue = True
 
     if threadAction != "quit": # if we've been asked to quit somewhere else in the program
         printDebugString("Leaving send mode and going back to background thread")
@@ -3948,80 +4959,242 @@ async def writeToLight(selectedLights=0, updateGUI=True, useGlobalValue=True):
 
     return returnValue
 
-# THE BACKGROUND WORKER THREAD
-def workerThread(_loop):
-    global threadAction
+# THE COMMANDS THE BACKGROUND WORKER CAN BE GIVEN (THROUGH submitWorkerCommand) - EACH ONE IS RUN IN THE ORDER IT WAS SENT
+class WorkerCommand:
+    def __init__(self, lightHandles = None):
+        self.lightHandles = lightHandles # the handles of the lights to work with (or None for the lights selected in the table)
 
-    # A LIST OF LIGHTS THAT DON'T SEND POWER/CHANNEL STATUS
-    lightsToNotCheckPower = ["NEEWER-RGB176"]
+class DiscoverCommand(WorkerCommand): # look for new lights (and link to them if autoConnectToLights is set) - lightHandles are lights already known to link to while scanning
+    pass
+
+class ConnectCommand(WorkerCommand): # link to lights
+    pass
+
+class SendCommand(WorkerCommand): # send the current sendValue to lights
+    pass
 
-    if findLightsOnStartup == True: # if we're set to find lights at startup, then automatically set the thread to discovery mode
-        threadAction = "discover"
+class SendStoredCommand(WorkerCommand): # send each light the last parameters stored for it (from a snapshot preset)
+    pass
 
-    delayTicks = 1 # count a few ticks before checking light information
+class QuitCommand(WorkerCommand): # stop the background worker
+    pass
+
+async def putWorkerCommand(command):
+    global workerCommands
+
+    if workerCommands == None: # the queue is made here, so it's always made inside the asyncio loop
+        workerCommands = asyncio.Queue()
+
+    await workerCommands.put(command)
+
+# HAND A COMMAND TO THE BACKGROUND WORKER FROM ANY THREAD (THE GUI, ETC.) - the worker picks it up as soon as
+# it's done with the command before it, instead of the next time it wakes up to check
+def submitWorkerCommand(command):
+    return runOnLoop(putWorkerCommand(command))
+
+# THE BACKGROUND WORKER - runs on the asyncio loop (started with runOnLoop) until it's told to quit
+async def workerLoop():
+    global threadAction, workerCommands
+
+    if workerCommands == None: # if nothing has been submitted yet, make the command queue
+        workerCommands = asyncio.Queue()
+
+    cachedLightHandles = None # the lights found on earlier scans to link to on startup (if we're set to)
+
+    if loadDiscoveryCache() > 0: # show the lights found on earlier scans right away
+        mainWindow.updateLights()
+
+        if autoConnectToLights == True:
+            cachedLightHandles = returnLightHandles(range(len(availableLights)))
+
+    if findLightsOnStartup == True: # if we're set to find lights at startup, then automatically start discovery (refreshing any lights from the cache)
+        await workerCommands.put(DiscoverCommand(cachedLightHandles)) # (linking to the cached lights while the scan runs)
+    elif cachedLightHandles != None:
+        await workerCommands.put(ConnectCommand(cachedLightHandles))
+
+    if passiveScanning == True: # keep the lights' signal levels up to date in the background
+        asyncio.ensure_future(passiveScan())
+
+    nextStatusCheck = time.time() + 3 # check light information every 3 seconds while there's nothing else to do
 
     while True:
-        if delayTicks < 12:
-            delayTicks += 1
-        elif delayTicks == 12:
-            delayTicks = 1
+        try: # sleep until either a command comes in or it's time to check the lights again
+            command = await asyncio.wait_for(workerCommands.get(), max(0, nextStatusCheck - time.time()))
+        except asyncio.TimeoutError:
             printDebugString("Background Thread Running")
+            await checkLightStatus()
 
-            # CHECK EACH LIGHT AGAINST THE TABLE TO SEE IF THERE ARE CONNECTION ISSUES
-            for a in range(len(availableLights)):
-                if threadAction == "": # if we're not sending, then update the light info... (check this before scanning each light)
-                    if availableLights[a][1] != "": # if there is a Bleak object, then check to see if it's connected
-                        if not availableLights[a][1].is_connected: # the light is disconnected, but we're reporting it isn't
-                            mainWindow.setTheTable(["", "", "NOT\nLINKED", "Light disconnected!"], a) # show the new status in the table
-                            availableLights[a][1] = "" # clear the Bleak object
-                        else:
-                            if not availableLights[a][0].name in lightsToNotCheckPower: # if the name of the current light is not in the list to skip checking
-                                _loop.run_until_complete(getLightChannelandPower(a)) # then check the power and light status of that light
-                                mainWindow.setTheTable(["", "", "LINKED\n" + availableLights[a][7][0] + " / ᴄʜ. " + str(availableLights[a][7][1]), ""], a)
-                            else: # if the light we're scanning doesn't supply power or channel status, then just show "LINKED"
-                                mainWindow.setTheTable(["", "", "LINKED", ""], a)
+            nextStatusCheck = time.time() + 3
+            continue
 
-        if threadAction == "quit":
+        if isinstance(command, QuitCommand) or threadAction == "quit":
             printDebugString("Stopping the background thread")
+            await stopPassiveScan() # stop listening for lights before they're unlinked
             threadAction = "finished"
             break # stop the background thread before quitting the program
-        elif threadAction == "discover":
-            threadAction = _loop.run_until_complete(findDevices()) # add new lights to the main array
+        elif isinstance(command, DiscoverCommand):
+            threadAction = "discover"
+            linkResults = {}
+            linkTasks = {}
+
+            # SHOW EACH LIGHT AS SOON AS IT'S FOUND (AND START LINKING TO IT, IF WE'RE SET TO)
+            def lightFound(light, newLight):
+                if newLight == True:
+                    mainWindow.addLightToTable(availableLights.indexOf(light))
+                else: # we already knew about this light, so just update its name (and signal level) on the table
+                    lightRow = availableLights.indexOf(light)
+                    mainWindow.setTheTable([mainWindow.returnLightTableName(lightRow), "", "", ""], lightRow)
+
+                if autoConnectToLights == True and threadAction != "quit" and light.handle not in linkTasks:
+                    linkTasks[light.handle] = asyncio.ensure_future(connectSingleLight(light, linkResults, len(availableLights)))
+
+            if command.lightHandles != None: # start linking to the lights we already know about now, instead of waiting for the scan to finish
+                for lightIdx in returnLightIndexesFromHandles(command.lightHandles):
+                    lightFound(availableLights[lightIdx], False)
+
+            threadAction = await findDevices(lightFound=lightFound) # add new lights to the main array
 
             if threadAction != "quit":
-                mainWindow.updateLights() # tell the GUI to update its list of available lights
+                mainWindow.updateScanStatus() # show how many lights were found (their rows were already added as they were found)
 
                 if autoConnectToLights == True: # if we're set to automatically link to the lights on startup, then do it here
-                    #for a in range(len(availableLights)):
-                    if threadAction != "quit": # if we're not supposed to quit, then try to connect to the light(s)
-                        _loop.run_until_complete(parallelAction("connect", [-1])) # connect to each available light in parallel
-
-                threadAction = ""
-        elif threadAction == "connect":
-            selectedLights = mainWindow.selectedLights() # get the list of currently selected lights
-
-            if threadAction != "quit": # if we're not supposed to quit, then try to connect to the light(s)
-                _loop.run_until_complete(parallelAction("connect", selectedLights)) # connect to each *selected* light in parallel
-
-            threadAction = ""                
-        elif threadAction == "send":
-            threadAction = _loop.run_until_complete(writeToLight()) # write a value to the light(s) - the selectedLights() section is in the write loop itself for responsiveness
-        elif threadAction != "":
-            threadAction = processMultipleSends(_loop, threadAction)
-        
-        time.sleep(0.25)
+                    threadAction = "connect"
+                    lightsNotFound = [a for a in range(len(availableLights)) if availableLights[a].handle not in linkTasks]
 
-def processMultipleSends(_loop, threadAction, updateGUI = True):
-    currentThreadAction = threadAction.split("|")
+                    if lightsNotFound != []: # try linking to the lights we already knew about, but didn't hear from on this scan
+                        await parallelAction("connect", lightsNotFound)
 
-    if currentThreadAction[0] == "send": # this will come from loading a custom snapshot preset
-        lightsToSendTo = [] # the current lights to affect
+            await asyncio.gather(*linkTasks.values()) # wait for the lights found on this scan to finish linking
+        elif isinstance(command, ConnectCommand):
+            threadAction = "connect"
 
-        for a in range (1, len(currentThreadAction)): # find the lights that need to be refreshed
-            lightsToSendTo.append(int(currentThreadAction[a]))
+            if command.lightHandles == None:
+                selectedLights = mainWindow.selectedLights() # get the list of currently selected lights
+            else:
+                selectedLights = returnLightIndexesFromHandles(command.lightHandles)
+
+            if selectedLights != []:
+                await parallelAction("connect", selectedLights) # connect to each *selected* light in parallel
+        elif isinstance(command, SendCommand):
+            threadAction = "send"
+
+            if command.lightHandles == None:
+                threadAction = await writeToLight() # write a value to the light(s) - the selectedLights() section is in the write loop itself for responsiveness
+            else:
+                threadAction = await writeToLight(returnLightIndexesFromHandles(command.lightHandles))
+        elif isinstance(command, SendStoredCommand):
+            threadAction = "send"
+            threadAction = await writeToLight(returnLightIndexesFromHandles(command.lightHandles), True, False) # write the value stored in the lights to the light(s)
 
-        threadAction = _loop.run_until_complete(writeToLight(lightsToSendTo, updateGUI, False)) # write the value stored in the lights to the light(s)
-        return threadAction
+        if threadAction != "quit":
+            threadAction = ""
+
+# CHECK EACH LIGHT AGAINST THE TABLE TO SEE IF THERE ARE CONNECTION ISSUES, AND UPDATE ITS POWER/CHANNEL STATUS
+# (up to maxStatusChecks lights are checked at once, and each light's row is updated as soon as its own check finishes)
+async def checkLightStatus():
+    statusCheckLimit = asyncio.Semaphore(max(1, maxStatusChecks))
+    await asyncio.gather(*[checkSingleLightStatus(light, statusCheckLimit) for light in list(availableLights)])
+
+async def checkSingleLightStatus(light, statusCheckLimit):
+    # A LIST OF LIGHTS THAT DON'T SEND POWER/CHANNEL STATUS
+    lightsToNotCheckPower = ["NEEWER-RGB176"]
+
+    async with statusCheckLimit:
+        if threadAction != "" or not workerCommands.empty(): # if there's something else to do, skip checking and do that first
+            return
+
+        if light.handle not in availableLights.byHandle: # the light isn't in the list anymore
+            return
+
+        if light.handle in reconnectTasks: # the light is being re-linked to in the background, so leave it alone
+            return
+
+        # (the light's row is found as we go, as the list can be re-sorted while we check)
+        if light[1] != "": # if there is a Bleak object, then check to see if it's connected
+            if not light[1].is_connected: # the light is disconnected, but we're reporting it isn't
+                mainWindow.setTheTable(["", "", "NOT\nLINKED", "Light disconnected!"], availableLights.indexOf(light)) # show the new status in the table
+                clearNotifications(light) # the notifications we were reading went away with the connection
+                light[1] = "" # clear the Bleak object
+            else:
+                if not light[0].name in lightsToNotCheckPower: # if the name of the current light is not in the list to skip checking
+                    await getLightChannelandPower(availableLights.indexOf(light)) # then check the power and light status of that light
+                    mainWindow.setTheTable(["", "", "LINKED\n" + light[7][0] + " / ᴄʜ. " + str(light[7][1]), ""], availableLights.indexOf(light))
+                else: # if the light we're scanning doesn't supply power or channel status, then just show "LINKED"
+                    mainWindow.setTheTable(["", "", "LINKED", ""], availableLights.indexOf(light))
+
+# CALLED BY BLEAK WHEN A LIGHT'S LINK DROPS - IF WE DIDN'T UNLINK FROM IT ON PURPOSE, START RE-LINKING TO IT IN THE BACKGROUND
+def lightDisconnected(lightHandle, client, updateGUI = True):
+    sceneRunningLights.discard(lightHandle) # the light may not be running the same scene when we link to it again
+    lastWrittenValues.pop(lightHandle, None) # (or have the same value)
+
+    if lightHandle in unlinkRequested: # we unlinked from this light ourselves
+        return
+
+    light = availableLights.byHandle.get(lightHandle, None)
+
+    if light == None or light[1] is not client: # the light isn't in the list anymore, or this is an old link that's already been replaced
+        return
+
+    printDebugString(f"Lost the link to light [{light[0].name}] {returnMACname()} {light[0].address}")
+
+    if autoReconnect == True and threadAction != "quit" and lightHandle not in reconnectTasks:
+        reconnectTasks[lightHandle] = asyncio.ensure_future(reconnectLight(light, updateGUI))
+
+# KEEP TRYING TO RE-LINK TO A LIGHT THAT DROPPED ITS LINK, THEN RE-SEND THE LAST PARAMETERS IT WAS GIVEN
+async def reconnectLight(light, updateGUI = True):
+    clearNotifications(light) # the notifications we were reading went away with the link
+
+    try:
+        while threadAction != "quit" and light.handle not in unlinkRequested and light.handle in availableLights.byHandle:
+            if updateGUI == True:
+                mainWindow.setTheTable(["", "", "NOT\nLINKED", "Light disconnected, trying to re-link..."], availableLights.indexOf(light))
+
+            await connectToLight(availableLights.indexOf(light), updateGUI) # this tries maxNumOfAttempts times (backing off between them)
+
+            if light[1] != "" and light[1].is_connected: # we're linked again
+                lastLinkTimes[light[0].address.upper()] = time.time()
+                printDebugString(f"Re-linked to light [{light[0].name}] {returnMACname()} {light[0].address}, re-sending the last parameters sent to it")
+
+                await writeToLight([availableLights.indexOf(light)], updateGUI, True, light[3][:]) # put the light back the way it was
+                break
+
+            # WAIT THE LONGEST RETRY DELAY (GIVE OR TAKE) BEFORE STARTING ANOTHER ROUND OF ATTEMPTS - OR IF WE'RE LISTENING FOR
+            # LIGHTS IN THE BACKGROUND, UNTIL WE HEAR THIS LIGHT ADVERTISING AGAIN (AS IT'S MOST LIKELY READY TO LINK TO THEN)
+            roundFinished = time.time()
+            waitUntil = roundFinished + connectRetryDelays[1] / 2 + random.uniform(0, connectRetryDelays[1] / 2)
+
+            while time.time() < waitUntil and lastSeenTimes.get(light[0].address.upper(), 0) <= roundFinished:
+                await asyncio.sleep(0.5)
+    finally:
+        reconnectTasks.pop(light.handle, None)
+
+# THE ORDER TO LINK TO LIGHTS IN - LIGHTS THAT WERE LINKED TO MOST RECENTLY FIRST, THEN THE LIGHTS WITH THE STRONGEST SIGNAL
+def linkPriority(light):
+    return (-lastLinkTimes.get(light[0].address.upper(), 0), -light[0].rssi)
+
+# LINK TO ONE LIGHT ONCE THERE'S ROOM TO (ONLY maxConnects LIGHTS ARE LINKED TO AT ONCE), AND RECORD HOW IT WENT
+async def connectSingleLight(light, linkResults, numOfLights, updateGUI = True):
+    global linkLimit
+
+    if linkLimit == None: # (the same limit is shared by every link, wherever it was started from)
+        linkLimit = asyncio.Semaphore(max(1, maxConnects))
+
+    async with linkLimit:
+        if threadAction == "quit" or light.handle not in availableLights.byHandle: # we're quitting, or the light isn't in the list anymore
+            return
+
+        await connectToLight(availableLights.indexOf(light), updateGUI)
+
+    linkResults[light.handle] = light[1] != "" and light[1].is_connected # whether or not we ended up linked to this light
+
+    if linkResults[light.handle] == True:
+        lastLinkTimes[light[0].address.upper()] = time.time()
+
+    linkProgress = f"Linked to {list(linkResults.values()).count(True)} of {numOfLights} light(s) ({len(linkResults)} of {numOfLights} attempted)"
+    printDebugString(linkProgress)
+
+    if updateGUI == True:
+        mainWindow.statusBar.showMessage(linkProgress)
 
 async def parallelAction(theAction, theLights, updateGUI = True):
     # SUBMIT A SERIES OF PARALLEL ASYNCIO FUNCTIONS TO RUN ALL IN PARALLEL
@@ -4033,10 +5206,22 @@ async def parallelAction(theAction, theLights, updateGUI = True):
         for a in range(len(availableLights)):
             theLights.append(a) # add all of availableLights to the list
 
+    if theAction == "connect": # connect to a series of lights, a few at a time, and return whether or not each light linked (keyed by handle)
+        lightsToLink = sorted([availableLights[a] for a in theLights], key=linkPriority)
+        linkResults = {}
+
+        if updateGUI == True:
+            for light in lightsToLink[maxConnects:]: # the lights that have to wait their turn
+                mainWindow.setTheTable(["", "", "", "Waiting to link..."], availableLights.indexOf(light))
+
+        for light in lightsToLink:
+            parallelFuncs.append(connectSingleLight(light, linkResults, len(lightsToLink), updateGUI))
+
+        await asyncio.gather(*parallelFuncs) # run the functions in parallel
+        return linkResults
+
     for a in range(len(theLights)):
-        if theAction == "connect": # connect to a series of lights
-            parallelFuncs.append(connectToLight(theLights[a], updateGUI))
-        elif theAction == "disconnect": # disconnect from a series of lights
+        if theAction == "disconnect": # disconnect from a series of lights
             parallelFuncs.append(disconnectFromLight(theLights[a], updateGUI))
         
     await asyncio.gather(*parallelFuncs) # run the functions in parallel
@@ -4075,7 +5260,7 @@ def processCommands(listToProcess=[]):
     if inStartupMode == True: # if we're using the GUI or CLI, then add these arguments to the list
         acceptable_arguments.extend(["--http", "--cli", "--silent", "--help"])
     else: # if we're using the HTTP server, then add these arguments to the list
-        acceptable_arguments.extend(["--custom_name", "--discover", "--nopage", "--link", "--use_preset", "--save_preset"])
+        acceptable_arguments.extend(["--custom_name", "--discover", "--nopage", "--link", "--use_preset", "--save_preset", "--reload_specs"])
 
     # KICK OUT ANY PARAMETERS THAT AREN'T IN THE "ACCEPTABLE ARGUMENTS" LIST
     for a in range(len(listToProcess) - 1, -1, -1):
@@ -4101,6 +5286,8 @@ def processCommands(listToProcess=[]):
             listToProcess[a] = "--html"
         elif listToProcess[a].find("--discover") != -1:
             listToProcess[a] = "--discover"
+        elif listToProcess[a].find("--reload_specs") != -1:
+            listToProcess[a] = "--reload_specs"
         elif listToProcess[a].find("--off") != -1:
             listToProcess[a] = "--off"
         elif listToProcess[a].find("--on") != -1:
@@ -4127,6 +5314,7 @@ def processCommands(listToProcess=[]):
     if inStartupMode == False:
         parser.add_argument("--custom_name", default=-1) # a new custom name for the light
         parser.add_argument("--discover", action="store_true") # tell the HTTP server to search for newly added lights
+        parser.add_argument("--reload_specs", action="store_true") # tell the HTTP server to re-load the light specification files
         parser.add_argument("--link", default=-1) # link a specific light to NeewerLite-Python
         parser.add_argument("--nopage", action="store_false") # don't render an HTML page
         parser.add_argument("--use_preset", default=-1) # number of custom preset to use via the HTTP interface
@@ -4180,6 +5368,9 @@ def processCommands(listToProcess=[]):
         if args.discover == True:
             return[None, args.nopage, None, "discover"] # discover new lights
 
+        if args.reload_specs == True:
+            return[None, args.nopage, None, "reload_specs"] # re-load the light specification files
+
         if args.link != -1:
             return[None, args.nopage, args.link, "link"] # return the value defined by the parameter
 
@@ -4235,27 +5426,31 @@ def processCommands(listToProcess=[]):
                 testValid("bri", args.bri, 100, 0, 100),
                 testValid("GM", GM, 50, 0, 100)]
 
-def processHTMLCommands(paramsList, loop):
-    global threadAction, serverBusy
+def processHTMLCommands(paramsList, writeResults = None):
+    global serverBusy, serverRequestsRunning
 
-    if threadAction == "": # if we're not already processing info in another thread
+    # MORE THAN ONE REQUEST CAN BE WORKED ON AT ONCE (THEY ALL SHARE THE ONE ASYNCIO LOOP), SO COUNT HOW MANY ARE RUNNING
+    with serverRequestsLock:
+        serverRequestsRunning += 1
         serverBusy[0] = True
-        threadAction = "HTTP"
 
+    try:
         if len(paramsList) != 0:
             if paramsList[3] == "discover": # we asked to discover new lights
-                asyncioEventLoop.run_until_complete(findDevices()) # find the lights available to control
+                runOnLoopAndWait(findDevices()) # find the lights available to control
 
                 # try to connect to each light
                 if autoConnectToLights == True:
-                    asyncioEventLoop.run_until_complete(parallelAction("connect", [-1], False)) # try to connect to *all* lights in parallel
+                    runOnLoopAndWait(parallelAction("connect", [-1], False)) # try to connect to *all* lights in parallel
             elif paramsList[3] == "link": # we asked to connect to a specific light
                 selectedLights = returnLightIndexesFromMacAddress(paramsList[2])
 
                 if len(selectedLights) > 0:
-                    asyncioEventLoop.run_until_complete(parallelAction("connect", selectedLights, False)) # try to connect to all *selected* lights in parallel
+                    runOnLoopAndWait(parallelAction("connect", selectedLights, False)) # try to connect to all *selected* lights in parallel
+            elif paramsList[3] == "reload_specs": # we asked to re-load the light specification files (for lights found from now on)
+                loadLightSpecs()
             elif paramsList[3] == "use_preset":
-                recallCustomPreset(paramsList[2] - 1, False, loop)
+                recallCustomPreset(paramsList[2] - 1, False)
             elif paramsList[3] == "save_preset":
                 pass
             elif paramsList[3] == "custom_name":
@@ -4270,32 +5465,57 @@ def processHTMLCommands(paramsList, loop):
                         saveLightPrefs(nameInfo[0]) # save the new custom name to the prefs file
 
             else: # we want to write a value to a specific light
+                # (the value is kept for this request only, and not put in sendValue, as another request might be using that)
                 if paramsList[3] == "CCT": # calculate CCT bytestring
-                    calculateByteString(colorMode=paramsList[3], temp=paramsList[4], brightness=paramsList[5], GM=paramsList[6])
+                    valueToSend = calculateByteString(True, colorMode=paramsList[3], temp=paramsList[4], brightness=paramsList[5], GM=paramsList[6])
                 elif paramsList[3] == "HSI": # calculate HSI bytestring
-                    calculateByteString(colorMode=paramsList[3], hue=paramsList[4], saturation=paramsList[5], brightness=paramsList[6])
+                    valueToSend = calculateByteString(True, colorMode=paramsList[3], hue=paramsList[4], saturation=paramsList[5], brightness=paramsList[6])
                 elif paramsList[3] == "ANM": # calculate ANM/SCENE bytestring
-                    calculateByteString(colorMode=paramsList[3], effect=paramsList[4], 
-                                        temp=paramsList[5], brightness=paramsList[6], GM=paramsList[7], hue=paramsList[8], sat=paramsList[9],
-                                        bright_min=paramsList[10], bright_max=paramsList[11],
-                                        temp_min=paramsList[12], temp_max=paramsList[13],
-                                        hue_min=paramsList[14], hue_max=paramsList[15],
-                                        speed=paramsList[16], sparks=paramsList[17],
-                                        specialOptions=paramsList[18])
-                elif paramsList[3] == "ON": # turn the light(s) on
-                    setPowerBytestring("ON")
-                elif paramsList[3] == "OFF": # turn the light(s) off
-                    setPowerBytestring("OFF")
+                    valueToSend = calculateByteString(True, colorMode=paramsList[3], effect=paramsList[4], 
+                                                      temp=paramsList[5], brightness=paramsList[6], GM=paramsList[7], hue=paramsList[8], sat=paramsList[9],
+                                                      bright_min=paramsList[10], bright_max=paramsList[11],
+                                                      temp_min=paramsList[12], temp_max=paramsList[13],
+                                                      hue_min=paramsList[14], hue_max=paramsList[15],
+                                                      speed=paramsList[16], sparks=paramsList[17],
+                                                      specialOptions=paramsList[18])
+                elif paramsList[3] == "ON" or paramsList[3] == "OFF": # turn the light(s) on or off
+                    valueToSend = calculateByteString(True, colorMode=paramsList[3])
+                else:
+                    valueToSend = None
 
                 selectedLights = returnLightIndexesFromMacAddress(paramsList[2])
 
-                if len(selectedLights) > 0:
-                    asyncioEventLoop.run_until_complete(writeToLight(selectedLights, False))
+                if len(selectedLights) > 0 and valueToSend != None:
+                    requestResults = runOnLoopAndWait(bulkWrite(selectedLights, valueToSend, False, writeRetries)) # write to every light at once
+                    reportWriteResults(requestResults) # and show which ones didn't work
 
-            threadAction = "" # clear the thread variable
-            serverBusy[0] = False
-    else:
-        printDebugString("The HTTP Server requested an action, but we're already working on one.  Please wait...")
+                    if writeResults != None: # hand how writing to each light went back to the request
+                        writeResults.extend(requestResults)
+    finally:
+        with serverRequestsLock:
+            serverRequestsRunning -= 1
+
+            if serverRequestsRunning == 0: # the last request running has finished
+                serverBusy[0] = False
+
+# CONVERT LIGHT INDEXES (WHICH CHANGE WHEN THE LIST IS SORTED) INTO HANDLES (WHICH NEVER CHANGE), AND BACK AGAIN
+def returnLightHandles(lightIndexes):
+    foundHandles = []
+
+    for a in range(len(lightIndexes)):
+        if lightIndexes[a] >= 0 and lightIndexes[a] < len(availableLights):
+            foundHandles.append(availableLights[lightIndexes[a]].handle)
+
+    return foundHandles
+
+def returnLightIndexesFromHandles(lightHandles):
+    foundIndexes = []
+
+    for a in range(len(lightHandles)):
+        if lightHandles[a] in availableLights.byHandle: # if the light is still in the list, find where it is now
+            foundIndexes.append(availableLights.indexOf(availableLights.byHandle[lightHandles[a]]))
+
+    return foundIndexes
 
 def returnLightIndexesFromMacAddress(addresses):
     foundIndexes = [] # the list of indexes for the lights you specified
@@ -4310,15 +5530,18 @@ def returnLightIndexesFromMacAddress(addresses):
             if addressesToCheck[a].isdigit(): # we can get an index out of this request
                 currentLight = int(addressesToCheck[a]) - 1
 
-                if currentLight < 0 or currentLight > len(availableLights):
+                if currentLight < 0 or currentLight >= len(availableLights):
                     currentLight = -1 # if the index is less than 0, or higher than the last available light, then... nada
-            else: # find the index from the MAC addresses
-                currentLight = -1
+            else: # find the index from the MAC address (or hardware MAC address)
+                foundLight = availableLights.findByAddress(addressesToCheck[a])
 
-                for b in range(len(availableLights)):
-                    if addressesToCheck[a].upper() == availableLights[b][0].address.upper(): # if the MAC address specified matches the current light
-                        currentLight = b
-                        break
+                if foundLight != None:
+                    currentLight = availableLights.indexOf(foundLight)
+                else: # if it's not a MAC address, it might be the custom name of one (or more) lights
+                    currentLight = -1
+
+                    for foundLight in availableLights.findByCustomName(addressesToCheck[a]):
+                        foundIndexes.append(availableLights.indexOf(foundLight))
 
             if currentLight != -1: # the found light index is valid
                 foundIndexes.append(currentLight) # add the found index to the list of indexes
@@ -4438,9 +5661,22 @@ class NLPythonServer(BaseHTTPRequestHandler):
                             self.wfile.write(bytes("<BR><HR><BR>\n", "utf-8"))
 
                         # PROCESS THE HTML COMMANDS IN ANOTHER THREAD
-                        htmlProcessThread = threading.Thread(target=processHTMLCommands, args=(paramsList, asyncioEventLoop), name="htmlProcessThread")
+                        writeResults = [] # how writing to each light went (if this request writes to any lights)
+                        htmlProcessThread = threading.Thread(target=processHTMLCommands, args=(paramsList, writeResults), name="htmlProcessThread")
                         htmlProcessThread.start()
 
+                        # IF WE'RE NOT RENDERING A PAGE (A SCRIPT IS SENDING THE REQUEST), WAIT FOR THE REQUEST TO FINISH, AND THEN
+                        # SEND BACK HOW WRITING TO EACH LIGHT WENT, ONE LINE PER LIGHT - ID #|MAC ADDRESS/GUID|STATUS|LATENCY (MS)|ERROR
+                        if paramsList[1] == False:
+                            htmlProcessThread.join()
+
+                            for writeResult in writeResults:
+                                light = availableLights.byHandle.get(writeResult.lightHandle, None)
+
+                                if light != None:
+                                    self.wfile.write(bytes("|".join([str(availableLights.indexOf(light) + 1), light[0].address, writeResult.status, \
+                                                                     str(round(writeResult.latency * 1000)), writeResult.error]) + "\n", "utf-8"))
+
                     if paramsList[1] == True: # if we've been asked to list the currently available lights, do that now
                         totalLights = len(availableLights)
 
@@ -4523,7 +5759,8 @@ class NLPythonServer(BaseHTTPRequestHandler):
                             self.wfile.write(bytes("     <TH STYLE='width:30%; text-align:left'>MAC Address/GUID</TH>\n", "utf-8"))
                             self.wfile.write(bytes("     <TH STYLE='width:5%; text-align:left'>RSSI</TH>\n", "utf-8"))
                             self.wfile.write(bytes("     <TH STYLE='width:5%; text-align:left'>Linked</TH>\n", "utf-8"))
-                            self.wfile.write(bytes("     <TH STYLE='width:22%; text-align:left'>Last Sent Value</TH>\n", "utf-8"))
+                            self.wfile.write(bytes("     <TH STYLE='width:14%; text-align:left'>Last Sent Value</TH>\n", "utf-8"))
+                            self.wfile.write(bytes("     <TH STYLE='width:8%; text-align:left'>Last Write</TH>\n", "utf-8"))
                             self.wfile.write(bytes("  </TR>\n", "utf-8"))
 
                             for a in range(totalLights):
@@ -4548,6 +5785,11 @@ class NLPythonServer(BaseHTTPRequestHandler):
                                     self.wfile.write(bytes("     <TD STYLE='background-color:rgb(240,248,255)'>" + formatURLForHyperlink("doAction?link=" + str(a + 1), "No") + "</TD>\n", "utf-8")) # is the light linked?
 
                                 self.wfile.write(bytes("     <TD STYLE='background-color:rgb(240,248,255)'>" + updateStatus(customValue=availableLights[a][3]) + "</TD>\n", "utf-8")) # the last sent value to the light
+
+                                if availableLights[a].handle in lastWriteResults: # how the last write to the light went
+                                    self.wfile.write(bytes("     <TD STYLE='background-color:rgb(240,248,255)'>" + returnWriteResultText(lastWriteResults[availableLights[a].handle]) + "</TD>\n", "utf-8"))
+                                else:
+                                    self.wfile.write(bytes("     <TD STYLE='background-color:rgb(240,248,255)'>---</TD>\n", "utf-8"))
                                 self.wfile.write(bytes("  </TR>\n", "utf-8"))
 
                             self.wfile.write(bytes("</TABLE>\n", "utf-8"))
@@ -4602,11 +5844,13 @@ def writeHTMLSections(self, theSection, errorMsg = ""):
         self.wfile.write(bytes("&nbsp;&nbsp;&nbsp;&nbsp;Example: <EM>http://(server address)/NeewerLite-Python/doAction?list</EM><BR>\n", "utf-8"))
         self.wfile.write(bytes("<STRONG>discover</STRONG> - tell NeewerLite-Python to scan for new lights<BR>\n", "utf-8"))
         self.wfile.write(bytes("&nbsp;&nbsp;&nbsp;&nbsp;Example: <EM>http://(server address)/NeewerLite-Python/doAction?discover</EM><BR>\n", "utf-8"))
+        self.wfile.write(bytes("<STRONG>reload_specs</STRONG> - tell NeewerLite-Python to re-load the light specification files (<EM>NeewerLite-Python-lights.json and light_prefs/lights.json</EM>) for lights found from now on<BR>\n", "utf-8"))
+        self.wfile.write(bytes("&nbsp;&nbsp;&nbsp;&nbsp;Example: <EM>http://(server address)/NeewerLite-Python/doAction?reload_specs</EM><BR>\n", "utf-8"))
         self.wfile.write(bytes("<STRONG>nopage</STRONG> - send a command to the HTTP server, but don't render the webpage showing the results (<EM>useful, for example, on a headless Raspberry Pi where you don't necessarily want to see the results page</EM>)<BR>\n", "utf-8"))
         self.wfile.write(bytes("&nbsp;&nbsp;&nbsp;&nbsp;Example: <EM>http://(server address)/NeewerLite-Python/doAction?nopage</EM><BR>\n", "utf-8"))
         self.wfile.write(bytes("<STRONG>link=</STRONG> - (value: <EM>index of light to link to</EM>) manually link to a specific light - you can specify multiple lights with semicolons (so link=1;2 would try to link to both lights 1 and 2)<BR>\n", "utf-8"))
         self.wfile.write(bytes("&nbsp;&nbsp;&nbsp;&nbsp;Example: <EM>http://(server address)/NeewerLite-Python/doAction?link=1</EM><BR>\n", "utf-8"))
-        self.wfile.write(bytes("<STRONG>light=</STRONG> - the MAC address (or current index of the light) you want to send a command to - you can specify multiple lights with semicolons (so light=1;2 would send a command to both lights 1 and 2)<BR>\n", "utf-8"))
+        self.wfile.write(bytes("<STRONG>light=</STRONG> - the MAC address (or current index, or custom name of the light) you want to send a command to - you can specify multiple lights with semicolons (so light=1;2 would send a command to both lights 1 and 2)<BR>\n", "utf-8"))
         self.wfile.write(bytes("&nbsp;&nbsp;&nbsp;&nbsp;Example: <EM>http://(server address)/NeewerLite-Python/doAction?light=11:22:33:44:55:66</EM><BR>\n", "utf-8"))
         self.wfile.write(bytes("<STRONG>mode=</STRONG> - the mode (value: <EM>HSI, CCT, and either ANM or SCENE</EM>) - the color mode to switch the light to<BR>\n", "utf-8"))
         self.wfile.write(bytes("&nbsp;&nbsp;&nbsp;&nbsp;Example: <EM>http://(server address)/NeewerLite-Python/doAction?mode=CCT</EM><BR>\n", "utf-8"))
@@ -4676,8 +5920,10 @@ def createLightPrefsFolder():
 
 def loadPrefsFile(globalPrefsFile = ""):
     global findLightsOnStartup, autoConnectToLights, printDebug, maxNumOfAttempts, \
-           rememberLightsOnExit, acceptable_HTTP_IPs, customKeys, enableTabsOnLaunch, \
-           whiteListedMACs, rememberPresetsOnExit
+           rememberLightsOnExit, acceptable_HTTP_IPs, customKeys, enableTabsOnLaunch, simulatedLights, \
+           whiteListedMACs, rememberPresetsOnExit, maxSendRate, maxStatusChecks, \
+           connectTimeout, connectDeadline, maxConnects, autoReconnect, targetedScanTime, discoveryCacheAge, \
+           passiveScanning, CCTSettleDelay, refreshInterval, reliableWrites, writeRetries
 
     if globalPrefsFile != "":
         printDebugString("Loading global preferences from file...")
@@ -4690,7 +5936,10 @@ def loadPrefsFile(globalPrefsFile = ""):
             "SC_Dec_Bri_Small", "SC_Inc_Bri_Small", "SC_Dec_Bri_Large", "SC_Inc_Bri_Large", \
             "SC_Dec_1_Small", "SC_Inc_1_Small", "SC_Dec_2_Small", "SC_Inc_2_Small", "SC_Dec_3_Small", "SC_Inc_3_Small", \
             "SC_Dec_1_Large", "SC_Inc_1_Large", "SC_Dec_2_Large", "SC_Inc_2_Large", "SC_Dec_3_Large", "SC_Inc_3_Large", \
-            "enableTabsOnLaunch", "whiteListedMACs", "rememberPresetsOnExit"]
+            "enableTabsOnLaunch", "whiteListedMACs", "rememberPresetsOnExit", "maxSendRate", "customSendRates", "maxStatusChecks", \
+            "connectTimeout", "connectDeadline", "maxConnects", "autoReconnect", "targetedScanTime", \
+            "discoveryCacheAge", "passiveScanning", "CCTSettleDelay", "refreshInterval", \
+            "reliableWrites", "customReliableWrites", "writeRetries", "simulatedLights"]
 
         # KICK OUT ANY PARAMETERS THAT AREN'T IN THE "ACCEPTABLE ARGUMENTS" LIST ABOVE
         # THIS SECTION OF CODE IS *SLIGHTLY* DIFFERENT THAN THE CLI KICK OUT CODE
@@ -4716,6 +5965,21 @@ def loadPrefsFile(globalPrefsFile = ""):
     prefsParser.add_argument("--acceptableIPs", default=["127.0.0.1", "192.168.", "10."])
     prefsParser.add_argument("--whiteListedMACs" , default=[])
     prefsParser.add_argument("--rememberPresetsOnExit", default=1)
+    prefsParser.add_argument("--maxSendRate", default=30)
+    prefsParser.add_argument("--customSendRates", default=[])
+    prefsParser.add_argument("--maxStatusChecks", default=4)
+    prefsParser.add_argument("--connectTimeout", default=10)
+    prefsParser.add_argument("--connectDeadline", default=60)
+    prefsParser.add_argument("--maxConnects", default=3)
+    prefsParser.add_argument("--autoReconnect", default=1)
+    prefsParser.add_argument("--targetedScanTime", default=5)
+    prefsParser.add_argument("--discoveryCacheAge", default=168)
+    prefsParser.add_argument("--passiveScanning", default=0)
+    prefsParser.add_argument("--CCTSettleDelay", default=50)
+    prefsParser.add_argument("--refreshInterval", default=5)
+    prefsParser.add_argument("--reliableWrites", default=0)
+    prefsParser.add_argument("--customReliableWrites", default=[])
+    prefsParser.add_argument("--writeRetries", default=2)
 
     # SHORTCUT KEY CUSTOMIZATIONS
     prefsParser.add_argument("--SC_turnOffButton", default="Ctrl+PgDown") # 0
@@ -4747,6 +6011,8 @@ def loadPrefsFile(globalPrefsFile = ""):
     # THESE ARE OPTIONS THAT HELP DEBUG THINGS, BUT AREN'T REALLY USEFUL FOR NORMAL OPERATION
     # enableTabsOnLaunch SHOWS ALL TABS ACTIVE (INSTEAD OF DISABLING THEM) ON LAUNCH SO EVEN WITHOUT A LIGHT, A BYTESTRING CAN BE CALCULATED
     prefsParser.add_argument("--enableTabsOnLaunch", default=0)
+    # simulatedLights USES SIMULATED LIGHTS INSTEAD OF REAL ONES, SO THE PROGRAM CAN BE TRIED OUT WITHOUT ANY LIGHTS (OR A BLUETOOTH ADAPTER)
+    prefsParser.add_argument("--simulatedLights", default=0)
 
     mainPrefs = prefsParser.parse_args(mainPrefs)
 
@@ -4766,6 +6032,35 @@ def loadPrefsFile(globalPrefsFile = ""):
     if type(mainPrefs.whiteListedMACs) is not list: # if we've specified MAC addresses to whitelist, add them to the global list
         whiteListedMACs = mainPrefs.whiteListedMACs.replace(" ", "").split(";")
 
+    maxSendRate = testValid("maxSendRate", mainPrefs.maxSendRate, 30, 0, 1000) # how many values per second to send to each light (0 - no limit)
+
+    if type(mainPrefs.customSendRates) is not list: # per-light send rates, given as MAC address=rate pairs (XX:XX:XX:XX:XX:XX=15;...)
+        for customRate in mainPrefs.customSendRates.replace(" ", "").split(";"):
+            customRate = customRate.split("=")
+
+            if len(customRate) == 2:
+                customSendRates[customRate[0].upper()] = testValid("customSendRates", customRate[1], maxSendRate, 0, 1000)
+
+    maxStatusChecks = testValid("maxStatusChecks", mainPrefs.maxStatusChecks, 4, 1, 50) # how many lights to check the status of at once
+    connectTimeout = testValid("connectTimeout", mainPrefs.connectTimeout, 10, 1, 120) # how long to wait for each attempt at linking to a light
+    connectDeadline = testValid("connectDeadline", mainPrefs.connectDeadline, 60, 1, 3600) # how long to keep trying to link to a light before giving up
+    maxConnects = testValid("maxConnects", mainPrefs.maxConnects, 3, 1, 20) # how many lights to try linking to at once
+    autoReconnect = bool(int(mainPrefs.autoReconnect)) # whether or not to re-link to lights that drop their link
+    targetedScanTime = testValid("targetedScanTime", mainPrefs.targetedScanTime, 5, 1, 120) # how long to look for the lights asked for with --light
+    discoveryCacheAge = testValid("discoveryCacheAge", mainPrefs.discoveryCacheAge, 168, 0, 8760) # how many hours to remember lights found on earlier scans
+    passiveScanning = bool(int(mainPrefs.passiveScanning)) # whether or not to keep the lights' signal levels up to date in the background
+    CCTSettleDelay = testValid("CCTSettleDelay", mainPrefs.CCTSettleDelay, 50, 0, 500) # how long CCT-only lights need between their 2 writes
+    refreshInterval = testValid("refreshInterval", mainPrefs.refreshInterval, 5, 0, 3600) # how long before the same value is written to a light again
+    reliableWrites = bool(int(mainPrefs.reliableWrites)) # whether or not to have the lights acknowledge each write
+    writeRetries = testValid("writeRetries", mainPrefs.writeRetries, 2, 0, 10) # how many times to retry lights that a write failed on
+
+    if type(mainPrefs.customReliableWrites) is not list: # per-light acknowledged writes, given as MAC address=1/0 pairs (XX:XX:XX:XX:XX:XX=1;...)
+        for customReliable in mainPrefs.customReliableWrites.replace(" ", "").split(";"):
+            customReliable = customReliable.split("=")
+
+            if len(customReliable) == 2:
+                customReliableWrites[customReliable[0].upper()] = bool(testValid("customReliableWrites", customReliable[1], int(reliableWrites), 0, 1))
+
     # RETURN THE CUSTOM KEYBOARD MAPPINGS
     customKeys = [mainPrefs.SC_turnOffButton, mainPrefs.SC_turnOnButton, mainPrefs.SC_scanCommandButton, mainPrefs.SC_tryConnectButton, \
                   mainPrefs.SC_Tab_CCT, mainPrefs.SC_Tab_HSI, mainPrefs.SC_Tab_SCENE, mainPrefs.SC_Tab_PREFS, \
@@ -4784,6 +6079,7 @@ def loadPrefsFile(globalPrefsFile = ""):
                   mainPrefs.SC_Inc_3_Large]
                 
     enableTabsOnLaunch = bool(int(mainPrefs.enableTabsOnLaunch))
+    simulatedLights = testValid("simulatedLights", mainPrefs.simulatedLights, 0, 0, 1000)
 
 if __name__ == '__main__':
     singleInstanceLock() # make a lockfile if one doesn't exist yet, and quit out if one does
@@ -4796,6 +6092,11 @@ if __name__ == '__main__':
     if os.path.exists(customLightPresetsFile):
         loadCustomPresets() # if there's a custom mapping for presets, then load that into memory
 
+    loadLightSpecs() # load any extra light specifications on top of the built-in ones
+
+    if simulatedLights > 0:
+        setUpSimulator(simulatedLights) # use simulated lights instead of real ones
+
     setUpAsyncio() # set up the asyncio loop
     cmdReturn = [True] # initially set to show the GUI interface over the CLI interface
 
@@ -4810,6 +6111,12 @@ if __name__ == '__main__':
         if cmdReturn[0] == "HTTP":
             doAnotherInstanceCheck() # check to see if another instance is running, and if it is, then error out and quit
                 
+            if loadDiscoveryCache() > 0: # link to the lights found on earlier scans while the server starts up
+                runOnLoop(linkToCachedLights())
+
+            if passiveScanning == True: # keep the lights' signal levels up to date in the background
+                runOnLoop(passiveScan(False))
+
             webServer = ThreadingHTTPServer(("", 8080), NLPythonServer)
 
             try:
@@ -4823,10 +6130,11 @@ if __name__ == '__main__':
             finally:
                 printDebugString("Stopping the HTTP Server...")
                 webServer.server_close()
+                runOnLoopAndWait(stopPassiveScan()) # stop listening for lights before they're unlinked
 
                 # DISCONNECT FROM EACH LIGHT BEFORE FINISHING THE PROGRAM
                 printDebugString("Attempting to unlink from lights...")
-                asyncioEventLoop.run_until_complete(parallelAction("disconnect", [-1], False)) # disconnect from all lights in parallel
+                runOnLoopAndWait(parallelAction("disconnect", [-1], False)) # disconnect from all lights in parallel
            
             printDebugString("Closing the program NOW")
             singleInstanceUnlockandQuit(0) # delete the lock file and quit out
@@ -4836,7 +6144,7 @@ if __name__ == '__main__':
 
             print("NeewerLite-Python [2025-02-01-BETA] by Zach Glenwright")
             print("Searching for nearby Neewer lights...")
-            asyncioEventLoop.run_until_complete(findDevices())
+            runOnLoopAndWait(findDevices())
 
             if len(availableLights) > 0:
                 print()
@@ -4910,7 +6218,10 @@ if __name__ == '__main__':
 
                 printDebugString("-------------------------------------------------------------------------------------")
 
-                asyncioEventLoop.run_until_complete(findDevices(limitToDevices = MACAddresses)) # get Bleak object linking to this specific light and getting custom prefs
+                if "ALL" in MACAddresses: # we want every light we can find
+                    runOnLoopAndWait(findDevices())
+                else: # look for only the lights asked for, and stop looking once they're all found
+                    runOnLoopAndWait(findDevices(limitToDevices = MACAddresses, scanTime = targetedScanTime)) # get Bleak object linking to this specific light and getting custom prefs
             else:
                 printDebugString("-------------------------------------------------------------------------------------")
                 printDebugString(" > CLI >> You did not specify a light to send the command to - use the --light switch")
@@ -4960,9 +6271,8 @@ if __name__ == '__main__':
 
                 mainWindow.show()
 
-                # START THE BACKGROUND THREAD
-                workerThread = threading.Thread(target=workerThread, args=(asyncioEventLoop,), name="workerThread")
-                workerThread.start()
+                # START THE BACKGROUND WORKER
+                runOnLoop(workerLoop())
 
                 if PySideGUI == "PySide2":
                     ret = app.exec_()
@@ -4996,26 +6306,40 @@ if __name__ == '__main__':
             printDebugString(" > CLI >> Attempting to connect to lights...")
             printDebugString("-------------------------------------------------------------------------------------")
             
-            asyncioEventLoop.run_until_complete(parallelAction("connect", [-1], False)) # connect to each available light in parallel
+            linkResults = runOnLoopAndWait(parallelAction("connect", [-1], False)) # connect to each available light in parallel
+
+            for a in range(len(availableLights)):
+                if linkResults.get(availableLights[a].handle, False) == False:
+                    printDebugString(f" > CLI >> Couldn't link to light [{availableLights[a][0].name}] {returnMACname()} {availableLights[a][0].address}")
 
             printDebugString("-------------------------------------------------------------------------------------")
-            printDebugString(" > CLI >> Attempting to write to lights, sending commands in 3 passes...")
+            printDebugString(" > CLI >> Attempting to write to lights...")
             printDebugString("-------------------------------------------------------------------------------------")
 
-            multipleSendString = "send"
+            # WRITE TO ALL OF THE LIGHTS AT ONCE (RETRYING ANY THAT FAIL) - LIGHTS THAT DON'T ACKNOWLEDGE WRITES
+            # CAN'T TELL US IF THEY GOT THE COMMAND, SO THOSE GET THE COMMAND 2 MORE TIMES, JUST IN CASE
+            writeResults = runOnLoopAndWait(bulkWrite(list(range(len(availableLights))), None, False, writeRetries))
 
-            for a in range(len(availableLights)):
-                multipleSendString += "|" + str(a) # add all lights to the list of lights to send commands to
+            for iteration in range(2):
+                unconfirmedHandles = [writeResult.lightHandle for writeResult in writeResults if writeResult.status == "sent" and writeResult.confirmed == False]
+
+                if unconfirmedHandles == []:
+                    break
+
+                printDebugString(f'Sending command to lights that can\'t acknowledge it (Pass {iteration + 2} of 3)...')
+                repeatResults = runOnLoopAndWait(bulkWrite(returnLightIndexesFromHandles(unconfirmedHandles)))
+                repeatResults = {writeResult.lightHandle: writeResult for writeResult in repeatResults}
+
+                for a in range(len(writeResults)):
+                    writeResults[a] = repeatResults.get(writeResults[a].lightHandle, writeResults[a])
 
-            for iteration in range(3):
-                printDebugString(f'Sending command to light (Pass {iteration + 1} of 3)...')
-                processMultipleSends(asyncioEventLoop, multipleSendString, False)
+            reportWriteResults(writeResults) # show which lights (if any) didn't get the command
             
             printDebugString("-------------------------------------------------------------------------------------")
             printDebugString(" > CLI >> Attempting to disconnect from lights...")
             printDebugString("-------------------------------------------------------------------------------------")
 
-            asyncioEventLoop.run_until_complete(parallelAction("disconnect", [-1], False)) # disconnect from each available light in parallel
+            runOnLoopAndWait(parallelAction("disconnect", [-1], False)) # disconnect from each available light in parallel
             singleInstanceUnlockandQuit(0) # delete the lock file and quit out
         else:
             printDebugString("-------------------------------------------------------------------------------------")